@@ -9,6 +9,28 @@ import os
 import keyword
 from datetime import datetime
 import sys
+import hashlib
+import functools
+import gzip
+import io
+import json
+import mmap
+import multiprocessing
+import queue
+import random
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import time
+import tokenize
+import tempfile
+import threading
+import pkgutil
+import types
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 
 PY_KEYWORDS = keyword.kwlist
@@ -69,6 +91,1649 @@ ALL_WORDS_JAVA = JAVA_KEYWORDS | JAVA_BUILTINS
 
 PAIRS = {'(': ')', '[': ']', '{': '}', '"': '"', "'": "'"}
 
+# Tags produced by the lexer, in a fixed order so they can be stored as small integer ids
+TOKEN_TAGS = (
+    "comment", "string", "number", "keyword", "builtin", "library", "def", "class", "import", "from",
+    "java_keyword", "java_builtin", "java_type", "java_comment", "java_string"
+)
+TOKEN_TAG_IDS = {tag: i for i, tag in enumerate(TOKEN_TAGS)}
+
+WORD_RE = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+NUMBER_RE = re.compile(r'\b\d+\.?\d*\b')
+
+PY_KEYWORD_SET = frozenset(PY_KEYWORDS)
+PY_BUILTIN_SET = frozenset(PY_BUILTINS)
+PY_LIBRARY_SET = frozenset(PY_LIBRARIES)
+
+# Changes whenever the vocabularies or tag set change, so stale cached highlights are never reused
+LEXER_SIGNATURE = hashlib.sha1(repr((
+    TOKEN_TAGS, PY_KEYWORDS, PY_BUILTINS, PY_LIBRARIES, sorted(JAVA_KEYWORDS), sorted(JAVA_BUILTINS)
+)).encode("utf-8")).hexdigest()[:12]
+
+
+def user_cache_dir():
+    """Per-user cache directory for SyntaxFixer"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "SyntaxFixer")
+
+
+def atomic_write(path, data):
+    """Write bytes via a temp file and os.replace so concurrent readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def tokenize_line(line, lang, state=0):
+    """Return the flat (tag_id, start, end, ...) runs of one line and the lexer state at its end"""
+    runs = []
+    if lang == "Python":
+        if '#' in line:
+            runs.extend((TOKEN_TAG_IDS["comment"], line.find('#'), len(line)))
+        string_id = TOKEN_TAG_IDS["string"]
+    elif lang == "Java":
+        if '//' in line:
+            runs.extend((TOKEN_TAG_IDS["java_comment"], line.find('//'), len(line)))
+        string_id = TOKEN_TAG_IDS["java_string"]
+    else:
+        return (), state
+
+    for quote in ['"', "'"]:
+        start = 0
+        while True:
+            start = line.find(quote, start)
+            if start == -1:
+                break
+            end = line.find(quote, start + 1)
+            if end == -1:
+                end = len(line)
+            runs.extend((string_id, start, min(end + 1, len(line))))
+            start = end + 1
+
+    number_id = TOKEN_TAG_IDS["number"]
+    for match in NUMBER_RE.finditer(line):
+        runs.extend((number_id, match.start(), match.end()))
+
+    for word in WORD_RE.finditer(line):
+        word_text = word.group()
+        if lang == "Python":
+            if word_text in PY_KEYWORD_SET:
+                if word_text in ("def", "class", "import", "from"):
+                    tag = word_text
+                else:
+                    tag = "keyword"
+            elif word_text in PY_BUILTIN_SET:
+                tag = "builtin"
+            elif word_text in PY_LIBRARY_SET:
+                tag = "library"
+            else:
+                continue
+        else:
+            if word_text in JAVA_KEYWORDS:
+                tag = "java_keyword"
+            elif word_text in JAVA_BUILTINS:
+                tag = "java_builtin"
+            elif word_text[0].isupper():
+                tag = "java_type"
+            else:
+                continue
+        runs.extend((TOKEN_TAG_IDS[tag], word.start(), word.end()))
+    # The lexer is line-local today, so every line ends in the initial state
+    return tuple(runs), state
+
+
+def lex_lines(lines, lang):
+    """Tokenize a list of lines, returning per-line runs and end-of-line lexer states"""
+    line_runs = []
+    states = array('B')
+    state = 0
+    for line in lines:
+        runs, state = tokenize_line(line, lang, state)
+        line_runs.append(runs)
+        states.append(state)
+    return line_runs, states
+
+
+class PackedNameTable:
+    """Immutable sorted set of names packed into a single bytes blob with an offset array.
+
+    Tens of thousands of names cost a few bytes each instead of a str object apiece;
+    lookups are a binary search over the packed entries.
+    """
+    MAGIC = b"SFNT"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHI")
+
+    def __init__(self, names=()):
+        encoded = sorted({name.encode("utf-8") for name in names})
+        self._offsets = array('I', [0])
+        for item in encoded:
+            self._offsets.append(self._offsets[-1] + len(item))
+        self._blob = b"".join(encoded)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._item(i).decode("utf-8")
+
+    def __contains__(self, name):
+        target = name.encode("utf-8")
+        i = self._lower_bound(target)
+        return i < len(self) and self._item(i) == target
+
+    def _item(self, i):
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def _lower_bound(self, target):
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._item(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def startswith(self, prefix, limit=None):
+        """Names beginning with prefix, in sorted order"""
+        target = prefix.encode("utf-8")
+        found = []
+        for i in range(self._lower_bound(target), len(self)):
+            item = self._item(i)
+            if not item.startswith(target) or (limit is not None and len(found) >= limit):
+                break
+            found.append(item.decode("utf-8"))
+        return found
+
+    def to_bytes(self):
+        offsets = array('I', self._offsets)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return self.HEADER.pack(self.MAGIC, self.VERSION, len(self)) + offsets.tobytes() + self._blob
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("foreign name table")
+        start = cls.HEADER.size
+        offsets = array('I')
+        offsets.frombytes(data[start:start + 4 * (count + 1)])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        blob = data[start + 4 * (count + 1):]
+        if len(offsets) != count + 1 or offsets[-1] != len(blob):
+            raise ValueError("truncated name table")
+        table = cls()
+        table._offsets = offsets
+        table._blob = blob
+        return table
+
+
+def discover_python_modules(paths=None):
+    """Top-level importable module names: the standard library plus everything on sys.path"""
+    names = set(getattr(sys, "stdlib_module_names", ())) | set(sys.builtin_module_names)
+    for module in pkgutil.iter_modules(sys.path if paths is None else paths):
+        if module.name.isidentifier():
+            names.add(module.name)
+    return names
+
+
+PACKAGE_CACHE_MAX_AGE = 30 * 24 * 3600
+
+
+class PackageVocabulary:
+    """Installed Python module names, scanned in a background thread and cached on disk.
+
+    Until the scan finishes the vocabulary is empty, so lookups never block the UI.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or user_cache_dir()
+        self.table = PackedNameTable()
+        self._thread = None
+
+    def __contains__(self, name):
+        return name in self.table
+
+    def startswith(self, prefix, limit=None):
+        return self.table.startswith(prefix, limit)
+
+    def load_async(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.load, name="package-vocabulary", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _cache_prefix(self):
+        # One family of tables per interpreter, so editors, the daemon and benchmarks run from
+        # different venvs don't evict each other's
+        interpreter = f"{sys.executable}\n{sys.version}".encode("utf-8", "surrogatepass")
+        return f"modules-{hashlib.sha1(interpreter).hexdigest()[:12]}-"
+
+    def _cache_path(self):
+        # Installing or removing a package touches its site directory, which changes the key
+        fingerprint = [sys.executable, sys.version]
+        for entry in sys.path:
+            try:
+                fingerprint.append(f"{entry}:{os.stat(entry or '.').st_mtime_ns}")
+            except OSError:
+                fingerprint.append(entry)
+        digest = hashlib.sha1("\n".join(fingerprint).encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.directory, f"{self._cache_prefix()}{digest}.bin")
+
+    def load(self):
+        path = self._cache_path()
+        try:
+            with open(path, "rb") as f:
+                self.table = PackedNameTable.from_bytes(f.read())
+        except (OSError, ValueError, struct.error):
+            pass
+        else:
+            # Mark the table as in use so other interpreters' cleanup leaves it alone
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return
+        self.table = PackedNameTable(discover_python_modules())
+        try:
+            atomic_write(path, self.table.to_bytes())
+        except OSError:
+            return
+        # The key changes whenever a sys.path entry is touched: drop this interpreter's older
+        # tables, and other interpreters' once nothing has used them for a while
+        prefix = self._cache_prefix()
+        expired = time.time() - PACKAGE_CACHE_MAX_AGE
+        try:
+            for entry in os.scandir(self.directory):
+                if not entry.name.startswith("modules-") or not entry.name.endswith(".bin") or entry.path == path:
+                    continue
+                if entry.name.startswith(prefix) or entry.stat().st_mtime < expired:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+
+PY_PACKAGES = PackageVocabulary()
+
+CORRECTION_CUTOFF = 0.7
+
+
+def correct_word(word, lang):
+    """Return the auto-correction of word for lang, or word itself when it needs none"""
+    if lang == "Python":
+        aliases, vocabulary = PY_ALIAS, ALL_WORDS
+    elif lang == "Java":
+        aliases, vocabulary = JAVA_ALIAS, ALL_WORDS_JAVA
+    else:
+        return word
+    lw = word.lower()
+    if lw in aliases:
+        return aliases[lw]
+    if word in vocabulary or not word.isidentifier() or len(word) < 2:
+        return word
+    if lang == "Python" and word in PY_PACKAGES:
+        return word
+    matches = difflib.get_close_matches(word, vocabulary, n=1, cutoff=CORRECTION_CUTOFF)
+    return matches[0] if matches else word
+
+
+SUGGESTION_OPTIONS = {
+    "Python": sorted(set(PY_KEYWORDS + PY_BUILTINS + PY_LIBRARIES)),
+    "Java": sorted(JAVA_KEYWORDS | JAVA_BUILTINS),
+}
+
+PY_BLOCK_STARTERS = ("def ", "class ", "if ", "elif ", "else", "for ", "while ", "try", "except", "finally", "with ")
+
+JAVA_BLOCK_PATTERN = re.compile(
+    r"(class\s+\w+)|(interface\s+\w+)|(^|\s)(public|private|protected)?\s*static\s*void\s+\w+\s*\([^\)]*\)$|"
+    r"^\s*(public|private|protected)?\s*\w+\s+\w+\s*\([^\)]*\)$"
+)
+
+
+def rank_suggestions(prefix, lang, limit=5):
+    """Completion candidates for prefix: case-insensitive prefix matches first, then fuzzy ones"""
+    options = SUGGESTION_OPTIONS.get(lang, [])
+    matches = [w for w in options if w.lower().startswith(prefix.lower())]
+    if lang == "Python" and len(matches) < limit:
+        matches += [m for m in PY_PACKAGES.startswith(prefix, limit=limit) if m not in matches]
+    if len(matches) < limit:
+        extra = difflib.get_close_matches(prefix, options, n=limit)
+        matches += [m for m in extra if m not in matches]
+    return matches[:limit]
+
+
+def line_fix(line, lang):
+    """The punctuation Enter should append to line: a Python block colon or a Java colon/semicolon"""
+    stripped = line.strip()
+    if lang == "Python":
+        if stripped.startswith(PY_BLOCK_STARTERS) and not line.rstrip().endswith(":"):
+            return ":"
+        return ""
+    if lang == "Java":
+        if stripped.startswith(("case ", "default")) and not stripped.endswith(":"):
+            return ":"
+        needs_semi = (
+            stripped and
+            not stripped.endswith((';', '{', '}', ':')) and
+            not stripped.startswith(('public ', 'private ', 'protected ', 'class ', 'interface ', 'else', 'if(', 'for(', 'while(', 'switch(', '@')) and
+            not stripped.startswith('//') and
+            not JAVA_BLOCK_PATTERN.match(stripped)
+        )
+        return ";" if needs_semi else ""
+    return ""
+
+
+class CorrectionEngine:
+    """Correction, completion and line fix-up requests, answered in-process.
+
+    The daemon serves one shared instance with a result cache; editors without a
+    daemon use an uncached one directly.
+    """
+
+    def __init__(self, cache_size=0):
+        self.correct = functools.lru_cache(maxsize=cache_size)(correct_word) if cache_size else correct_word
+
+    def suggest(self, prefix, lang, limit=5):
+        return rank_suggestions(prefix, lang, limit)
+
+    def fix_line(self, line, lang):
+        return line_fix(line, lang)
+
+    def handle(self, request):
+        """Answer one protocol request ({"op": ..., ...}); batches hold a list of requests"""
+        op = request["op"]
+        if op == "correct":
+            return self.correct(request["word"], request["lang"])
+        if op == "suggest":
+            return self.suggest(request["prefix"], request["lang"], request.get("limit", 5))
+        if op == "fix_line":
+            return self.fix_line(request["line"], request["lang"])
+        if op == "batch":
+            return [self.handle(item) for item in request["requests"]]
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"unknown op {op!r}")
+
+
+def daemon_socket_path():
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or user_cache_dir(), "syntaxfixer.sock")
+
+
+class CorrectionClient:
+    """Editor-side engine that talks to the correction daemon, falling back to in-process logic.
+
+    A failed connection is retried at most every RETRY_SECONDS so a missing daemon
+    costs nothing per keystroke.
+    """
+    RETRY_SECONDS = 30
+
+    def __init__(self, path=None, timeout=0.5):
+        self.path = path or daemon_socket_path()
+        self.timeout = timeout
+        self.local = CorrectionEngine()
+        self._sock = None
+        self._reader = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if not hasattr(socket, "AF_UNIX") or time.monotonic() < self._next_attempt:
+            return False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            self._next_attempt = time.monotonic() + self.RETRY_SECONDS
+            return False
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        return True
+
+    def close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+    def call(self, request):
+        with self._lock:
+            if self._sock is not None or self._connect():
+                try:
+                    self._sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                    line = self._reader.readline()
+                    if not line:
+                        raise OSError("correction daemon closed the connection")
+                    reply = json.loads(line)
+                    if "error" not in reply:
+                        return reply["result"]
+                except (OSError, ValueError):
+                    self.close()
+                    self._next_attempt = time.monotonic() + self.RETRY_SECONDS
+        return self.local.handle(request)
+
+    def correct(self, word, lang):
+        return self.call({"op": "correct", "word": word, "lang": lang})
+
+    def suggest(self, prefix, lang, limit=5):
+        return self.call({"op": "suggest", "prefix": prefix, "lang": lang, "limit": limit})
+
+    def fix_line(self, line, lang):
+        return self.call({"op": "fix_line", "line": line, "lang": lang})
+
+    def batch(self, requests):
+        return self.call({"op": "batch", "requests": requests})
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                reply = {"id": request_id, "result": self.server.engine.handle(request)}
+            except Exception as e:
+                reply = {"id": request_id, "error": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def daemon_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py --daemon", description="Shared correction daemon")
+    parser.add_argument("--socket", default=daemon_socket_path(), help="Unix socket to listen on")
+    args = parser.parse_args(argv)
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        print("The correction daemon needs Unix domain sockets", file=sys.stderr)
+        return 1
+    probe = CorrectionClient(args.socket)
+    if probe._connect():
+        probe.close()
+        print(f"A correction daemon is already listening on {args.socket}", file=sys.stderr)
+        return 1
+    try:
+        os.remove(args.socket)
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(args.socket) or ".", exist_ok=True)
+
+    PY_PACKAGES.load()
+    server = socketserver.ThreadingUnixStreamServer(args.socket, _DaemonHandler)
+    server.daemon_threads = True
+    server.engine = CorrectionEngine(cache_size=65536)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(args.socket)
+        except OSError:
+            pass
+    return 0
+
+
+def _daemon_bench_client(path, words, count, batch):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    reader = sock.makefile("rb")
+    latencies = []
+    started = time.perf_counter()
+    for n in range(0, count, batch):
+        requests = []
+        for k in range(n, min(n + batch, count)):
+            word = words[k % len(words)]
+            kind = k % 3
+            if kind == 0:
+                requests.append({"op": "correct", "word": word, "lang": "Python"})
+            elif kind == 1:
+                requests.append({"op": "suggest", "prefix": word[:3], "lang": "Python"})
+            else:
+                requests.append({"op": "fix_line", "line": f"if {word} == 1", "lang": "Python"})
+        request = requests[0] if batch == 1 else {"op": "batch", "requests": requests}
+        sent = time.perf_counter()
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        reply = json.loads(reader.readline())
+        latencies.append(time.perf_counter() - sent)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+    elapsed = time.perf_counter() - started
+    sock.close()
+    return count, elapsed, latencies
+
+
+def daemon_bench_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py --daemon-bench",
+                                     description="Requests per second of the correction daemon under concurrent clients")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per client")
+    parser.add_argument("--batch", type=int, default=1, help="requests per round trip")
+    parser.add_argument("--socket", help="benchmark an already running daemon instead of starting one")
+    args = parser.parse_args(argv)
+
+    daemon = None
+    path = args.socket
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="syntaxfixer-"), "bench.sock")
+        daemon = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--daemon", "--socket", path])
+        probe = CorrectionClient(path)
+        deadline = time.monotonic() + 30
+        while not probe._connect():
+            if time.monotonic() > deadline or daemon.poll() is not None:
+                daemon.kill()
+                print("Correction daemon did not start", file=sys.stderr)
+                return 1
+            probe._next_attempt = 0.0
+            time.sleep(0.05)
+        probe.close()
+
+    try:
+        words = [typo for typo, _ in build_correction_corpus()["Python"][0]]
+        with ProcessPoolExecutor(max_workers=args.clients) as pool:
+            futures = [pool.submit(_daemon_bench_client, path, words[i::args.clients] or words, args.requests, args.batch)
+                       for i in range(args.clients)]
+            results = [f.result() for f in futures]
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+
+    total = sum(count for count, _, _ in results)
+    wall = max(elapsed for _, elapsed, _ in results)
+    latencies = sorted(l for _, _, client in results for l in client)
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "clients": args.clients,
+        "batch": args.batch,
+        "requests": total,
+        "seconds": round(wall, 4),
+        "requests_per_second": round(total / wall, 1) if wall else None,
+        "round_trip_ms_p50": round(latencies[len(latencies) // 2] * 1000, 3),
+        "round_trip_ms_p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def make_typos(word, rng):
+    """One transposition, one dropped letter and one doubled letter of word"""
+    typos = []
+    swaps = [i for i in range(len(word) - 1) if word[i] != word[i + 1]]
+    if swaps:
+        i = rng.choice(swaps)
+        typos.append(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+    if len(word) > 3:
+        i = rng.randrange(len(word))
+        typos.append(word[:i] + word[i + 1:])
+    i = rng.randrange(len(word))
+    typos.append(word[:i + 1] + word[i:])
+    return typos
+
+
+BENCHMARK_LANGUAGES = {".py": "Python", ".java": "Java"}
+JAVA_NON_CODE_RE = re.compile(r'"""[\s\S]*?"""|//[^\n]*|/\*[\s\S]*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+
+
+def source_identifiers(source, lang):
+    """Identifiers used as code in source, leaving out comments and string literals"""
+    if lang == "Java":
+        return WORD_RE.findall(JAVA_NON_CODE_RE.sub(" ", source))
+    names = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type == tokenize.NAME:
+                names.append(token.string)
+    except (tokenize.TokenError, SyntaxError):
+        # Keep what was read before the file stopped tokenizing
+        pass
+    return names
+
+
+def build_correction_corpus(paths=(), seed=0):
+    """Typo cases (typo, intended word) and valid user identifiers per language, taken from code only"""
+    rng = random.Random(seed)
+    vocabularies = {"Python": ALL_WORDS, "Java": ALL_WORDS_JAVA}
+    targets = {lang: {w for w in vocab if w.isidentifier() and len(w) >= 3} for lang, vocab in vocabularies.items()}
+    identifiers = {lang: set() for lang in vocabularies}
+    for path in paths:
+        lang = BENCHMARK_LANGUAGES.get(os.path.splitext(path)[1].lower())
+        if lang is None:
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for word in source_identifiers(f.read(), lang):
+                if word in vocabularies[lang]:
+                    if len(word) >= 3:
+                        targets[lang].add(word)
+                elif len(word) >= 2:
+                    identifiers[lang].add(word)
+    corpus = {}
+    for lang, vocab in vocabularies.items():
+        cases = []
+        for word in sorted(targets[lang]):
+            for typo in make_typos(word, rng):
+                if typo not in vocab:
+                    cases.append((typo, word))
+        corpus[lang] = (cases, sorted(identifiers[lang]))
+    return corpus
+
+
+def _correct_batch(lang, words):
+    return [correct_word(word, lang) for word in words]
+
+
+def _benchmark_worker_init():
+    PY_PACKAGES.load()
+
+
+def run_correction_benchmark(paths=(), seed=0, workers=None, batch_size=256):
+    """Measure auto-correction quality and throughput; returns a JSON-serialisable report"""
+    corpus = build_correction_corpus(paths, seed)
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "seed": seed,
+        "cutoff": CORRECTION_CUTOFF,
+        "files": list(paths),
+        "workers": workers or os.cpu_count() or 1,
+        "languages": {},
+    }
+    with ProcessPoolExecutor(max_workers=report["workers"], initializer=_benchmark_worker_init) as pool:
+        for lang, (cases, identifiers) in corpus.items():
+            words = [typo for typo, _ in cases] + identifiers
+            batches = [words[i:i + batch_size] for i in range(0, len(words), batch_size)]
+            started = time.perf_counter()
+            results = []
+            for batch in pool.map(_correct_batch, [lang] * len(batches), batches):
+                results.extend(batch)
+            elapsed = time.perf_counter() - started
+
+            typo_results = results[:len(cases)]
+            corrected = sum(1 for (typo, _), out in zip(cases, typo_results) if out != typo)
+            correct = sum(1 for (_, intended), out in zip(cases, typo_results) if out == intended)
+            false_corrections = sum(1 for word, out in zip(identifiers, results[len(cases):]) if out != word)
+            report["languages"][lang] = {
+                "typos": len(cases),
+                "corrected": corrected,
+                "correct": correct,
+                "precision": round(correct / corrected, 4) if corrected else None,
+                "recall": round(correct / len(cases), 4) if cases else None,
+                "valid_identifiers": len(identifiers),
+                "false_corrections": false_corrections,
+                "false_correction_rate": round(false_corrections / len(identifiers), 4) if identifiers else None,
+                "seconds": round(elapsed, 4),
+                "words_per_second": round(len(words) / elapsed, 1) if elapsed else None,
+            }
+    return report
+
+
+def benchmark_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py --benchmark",
+                                     description="Auto-correction accuracy and throughput benchmark")
+    parser.add_argument("files", nargs="*", help="Python/Java source files to draw words and identifiers from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    report = json.dumps(run_correction_benchmark(args.files, args.seed, args.workers), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+def merge_runs(runs):
+    """Per-tag sorted, disjoint, non-touching (start, end) spans covered by a line's flat runs.
+
+    This is the shape Tk itself keeps for a tag, so it can be diffed against directly.
+    """
+    by_tag = {}
+    for k in range(0, len(runs), 3):
+        by_tag.setdefault(runs[k], []).append((runs[k + 1], runs[k + 2]))
+    merged = {}
+    for tag_id, spans in by_tag.items():
+        spans.sort()
+        out = []
+        for start, end in spans:
+            if end <= start:
+                continue
+            if out and start <= out[-1][1]:
+                out[-1] = (out[-1][0], max(out[-1][1], end))
+            else:
+                out.append((start, end))
+        if out:
+            merged[tag_id] = out
+    return merged
+
+
+def interval_difference(a, b):
+    """Parts of the sorted disjoint spans a that are not covered by the sorted disjoint spans b"""
+    out = []
+    j = 0
+    for start, end in a:
+        while j < len(b) and b[j][1] <= start:
+            j += 1
+        k = j
+        cur = start
+        while k < len(b) and b[k][0] < end:
+            if b[k][0] > cur:
+                out.append((cur, b[k][0]))
+            cur = max(cur, b[k][1])
+            k += 1
+        if cur < end:
+            out.append((cur, end))
+    return out
+
+
+def shift_spans_insert(tags, col, count):
+    """Move merged spans the way Tk does for count chars inserted at col without a tag list"""
+    shifted = {}
+    for tag_id, spans in tags.items():
+        out = []
+        for start, end in spans:
+            if start >= col:
+                out.append((start + count, end + count))
+            elif end > col:
+                # Both neighbours carry the tag, so the inserted text inherits it
+                out.append((start, end + count))
+            else:
+                out.append((start, end))
+        shifted[tag_id] = out
+    return shifted
+
+
+def shift_spans_delete(tags, start_col, end_col):
+    """Move merged spans the way Tk does when columns start_col..end_col are deleted"""
+    width = end_col - start_col
+
+    def move(pos):
+        if pos <= start_col:
+            return pos
+        return start_col if pos <= end_col else pos - width
+
+    shifted = {}
+    for tag_id, spans in tags.items():
+        out = []
+        for start, end in spans:
+            start, end = move(start), move(end)
+            if end <= start:
+                continue
+            if out and start <= out[-1][1]:
+                out[-1] = (out[-1][0], max(out[-1][1], end))
+            else:
+                out.append((start, end))
+        if out:
+            shifted[tag_id] = out
+    return shifted
+
+
+class TokenCache:
+    """On-disk cache of per-line token runs keyed by content hash and language.
+
+    Entries are packed arrays written atomically, so several editor processes can
+    share the directory; the least recently used entries are evicted past max_bytes.
+    """
+    MAGIC = b"SFTC"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHII")
+
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        self.directory = directory or os.path.join(user_cache_dir(), "tokens")
+        self.max_bytes = max_bytes
+
+    def _path(self, content, lang):
+        digest = hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.directory, f"{digest}-{lang.lower()}-{LEXER_SIGNATURE}.tok")
+
+    def load(self, content, lang):
+        path = self._path(content, lang)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            magic, version, nlines, nvalues = self.HEADER.unpack_from(data)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError("foreign cache entry")
+            offset = self.HEADER.size
+            counts = array('I')
+            counts.frombytes(data[offset:offset + 4 * nlines])
+            offset += 4 * nlines
+            values = array('I')
+            values.frombytes(data[offset:offset + 4 * nvalues])
+            offset += 4 * nvalues
+            states = array('B')
+            states.frombytes(data[offset:offset + nlines])
+            if sys.byteorder == "big":
+                counts.byteswap()
+                values.byteswap()
+            if len(states) != nlines or sum(counts) != nvalues:
+                raise ValueError("truncated cache entry")
+        except (struct.error, ValueError):
+            self._discard(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        line_runs = []
+        pos = 0
+        for count in counts:
+            line_runs.append(tuple(values[pos:pos + count]))
+            pos += count
+        return line_runs, states
+
+    def store(self, content, lang, line_runs, states):
+        counts = array('I', (len(runs) for runs in line_runs))
+        values = array('I')
+        for runs in line_runs:
+            values.extend(runs)
+        if sys.byteorder == "big":
+            counts.byteswap()
+            values.byteswap()
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, len(counts), len(values))
+        try:
+            atomic_write(self._path(content, lang), header + counts.tobytes() + values.tobytes() + bytes(states))
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".tok"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes * 0.8:
+                break
+            self._discard(path)
+            total -= size
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+
+JOURNAL_DIR = os.path.join(user_cache_dir(), "journal")
+JOURNAL_FLUSH_MS = 1000
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+JOURNAL_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal-writer")
+
+
+def text_digest(text):
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).digest()
+
+
+def journal_prefix(filename):
+    if filename:
+        path = os.path.abspath(filename).encode("utf-8", "surrogatepass")
+        return "file-" + hashlib.sha1(path).hexdigest()[:20] + "-"
+    return "untitled-"
+
+
+def journal_key(filename):
+    """Journal file stem for a document in this process; each editor owns its own journal"""
+    return f"{journal_prefix(filename)}{os.getpid()}"
+
+
+def apply_edit(lines, op, start, end, text=""):
+    """Apply one insert/delete, given in Tk line.col coordinates, to a buffer held as a list of lines"""
+    line, col = start
+    if op == "insert":
+        current = lines[line - 1]
+        lines[line - 1:line] = (current[:col] + text + current[col:]).split('\n')
+    elif op == "delete":
+        end_line, end_col = end
+        lines[line - 1:end_line] = [lines[line - 1][:col] + lines[end_line - 1][end_col:]]
+
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_ACCESS_DENIED = 5
+STILL_ACTIVE = 259
+
+
+def pid_alive(pid):
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Access denied means the process exists but belongs to someone else
+            return kernel32.GetLastError() == ERROR_ACCESS_DENIED
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    if os.name != "posix":
+        # Liveness unknown: assume the owner is still running so its journal is left alone
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def orphaned_journals(directory, prefix):
+    """Keys of journals starting with prefix whose owning editor is no longer running, newest first"""
+    entries = []
+    try:
+        for entry in os.scandir(directory):
+            if entry.name.startswith(prefix) and entry.name.endswith(".jnl"):
+                key = entry.name[:-len(".jnl")]
+                try:
+                    pid = int(key.rsplit('-', 1)[1])
+                except ValueError:
+                    continue
+                if pid != os.getpid() and not pid_alive(pid):
+                    entries.append((entry.stat().st_mtime, key))
+    except OSError:
+        return []
+    entries.sort(reverse=True)
+    return [key for _, key in entries]
+
+
+class EditJournal:
+    """Append-only binary log of buffer edits, replayed onto the saved file after a crash.
+
+    Records are buffered in memory and handed in batches to JOURNAL_WRITER, which does all
+    file I/O off the Tk thread, so their cost follows the size of the edit rather than the
+    buffer. compact() folds the log into a checkpoint.
+    """
+    MAGIC = b"SFJ1"
+    HEADER = struct.Struct("<4s20s")
+    INSERT = 1
+    DELETE = 2
+    INSERT_RECORD = struct.Struct("<BIII")
+    DELETE_RECORD = struct.Struct("<BIIII")
+
+    def __init__(self, directory, key, base_digest, checkpoint=None):
+        self.path = os.path.join(directory, key + ".jnl")
+        self.checkpoint_path = os.path.join(directory, key + ".ckpt")
+        self._pending = bytearray()
+        self.lost = False
+        self.size = self.HEADER.size
+        self._submit(self._start, base_digest, checkpoint)
+
+    def _submit(self, fn, *args):
+        JOURNAL_WRITER.submit(self._write, fn, args)
+
+    def _write(self, fn, args):
+        try:
+            fn(*args)
+        except OSError:
+            pass
+
+    def _start(self, base_digest, checkpoint):
+        # Checkpoint first: a header whose digest matches nothing means compaction was interrupted
+        if checkpoint is None:
+            self._remove(self.checkpoint_path)
+        else:
+            atomic_write(self.checkpoint_path, checkpoint.encode("utf-8", "surrogatepass"))
+        atomic_write(self.path, self.HEADER.pack(self.MAGIC, base_digest))
+
+    def record_insert(self, start, text):
+        payload = text.encode("utf-8", "surrogatepass")
+        self._pending += self.INSERT_RECORD.pack(self.INSERT, start[0], start[1], len(payload))
+        self._pending += payload
+
+    def record_delete(self, start, end):
+        self._pending += self.DELETE_RECORD.pack(self.DELETE, start[0], start[1], end[0], end[1])
+
+    def flush(self):
+        if not self._pending:
+            return
+        self.size += len(self._pending)
+        self._submit(self._append, bytes(self._pending))
+        self._pending.clear()
+
+    def _append(self, data):
+        try:
+            # Never create the file here: records without the header in front can't be replayed
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        except FileNotFoundError:
+            self.lost = True
+            return
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, text):
+        """Replace the log with a checkpoint of the current buffer"""
+        self._pending.clear()
+        self.size = self.HEADER.size
+        self.lost = False
+        self._submit(self._start, text_digest(text), text)
+
+    def discard(self):
+        self._pending.clear()
+        self._submit(self.remove_files, self.path, self.checkpoint_path)
+
+    @classmethod
+    def remove_files(cls, *paths):
+        for path in paths:
+            cls._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @classmethod
+    def remove(cls, directory, key):
+        cls.remove_files(os.path.join(directory, key + ".jnl"), os.path.join(directory, key + ".ckpt"))
+
+    @classmethod
+    def recover(cls, directory, key, saved_text=None):
+        """Rebuild the buffer from a leftover journal, or None if there is nothing to recover"""
+        try:
+            with open(os.path.join(directory, key + ".jnl"), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < cls.HEADER.size:
+            return None
+        magic, base_digest = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            return None
+        try:
+            with open(os.path.join(directory, key + ".ckpt"), "rb") as f:
+                checkpoint = f.read().decode("utf-8", "surrogatepass")
+        except (OSError, UnicodeDecodeError):
+            checkpoint = None
+        candidates = [checkpoint, saved_text]
+        if saved_text and saved_text.endswith('\n'):
+            # save_file writes the widget's trailing newline as well
+            candidates.append(saved_text[:-1])
+        base = next((c for c in candidates if c is not None and text_digest(c) == base_digest), None)
+        if base is None:
+            # Interrupted compaction: the checkpoint already contains every logged edit
+            return checkpoint
+
+        lines = base.split('\n')
+        pos = cls.HEADER.size
+        while pos < len(data):
+            try:
+                if data[pos] == cls.INSERT:
+                    _, line, col, length = cls.INSERT_RECORD.unpack_from(data, pos)
+                    pos += cls.INSERT_RECORD.size
+                    if pos + length > len(data):
+                        break
+                    text = data[pos:pos + length].decode("utf-8", "surrogatepass")
+                    pos += length
+                    apply_edit(lines, "insert", (line, col), None, text)
+                elif data[pos] == cls.DELETE:
+                    _, line, col, end_line, end_col = cls.DELETE_RECORD.unpack_from(data, pos)
+                    pos += cls.DELETE_RECORD.size
+                    apply_edit(lines, "delete", (line, col), (end_line, end_col))
+                else:
+                    break
+            except (struct.error, UnicodeDecodeError, IndexError):
+                # A torn final record from the crash; everything before it is intact
+                break
+        return '\n'.join(lines)
+
+
+DIFF_DELAY_MS = 300
+
+
+DIFF_MAX_COST = 1024
+
+
+def _middle_snake(a, b, left, top, right, bottom):
+    """Find the middle snake of the box a[left:right] x b[top:bottom] (Myers, section 4b).
+
+    Diagonals are clipped to the box. Returns None once the search passes DIFF_MAX_COST,
+    so a heavy rewrite costs a bounded amount instead of O(D^2).
+    """
+    width, height = right - left, bottom - top
+    size = width + height
+    delta = width - height
+    limit = min((size + 1) // 2, DIFF_MAX_COST)
+    vf = [0] * (2 * limit + 3)
+    vb = [0] * (2 * limit + 3)
+    vf[1] = left
+    vb[1] = bottom
+    for d in range(limit + 1):
+        # Forward diagonals k = x - y stay within [-height, width]
+        low, high = max(-d, -height), min(d, width)
+        low += (low + d) & 1
+        high -= (high + d) & 1
+        for k in range(high, low - 1, -2):
+            c = k - delta
+            if k == low and k - 1 < -height or k == -d or (k != d and k + 1 <= width and vf[k - 1] < vf[k + 1]):
+                px = x = vf[k + 1]
+            else:
+                px = vf[k - 1]
+                x = px + 1
+            y = top + (x - left) - k
+            py = y if d == 0 or x != px else y - 1
+            while x < right and y < bottom and a[x] == b[y]:
+                x += 1
+                y += 1
+            vf[k] = x
+            if delta & 1 and -(d - 1) <= c <= d - 1 and -width <= c <= height and y >= vb[c]:
+                return (px, py), (x, y)
+        # Backward diagonals c = k - delta stay within [-width, height]
+        low, high = max(-d, -width), min(d, height)
+        low += (low + d) & 1
+        high -= (high + d) & 1
+        for c in range(high, low - 1, -2):
+            k = c + delta
+            if c == low and c - 1 < -width or c == -d or (c != d and c + 1 <= height and vb[c - 1] > vb[c + 1]):
+                py = y = vb[c + 1]
+            else:
+                py = vb[c - 1]
+                y = py - 1
+            x = left + (y - top) + k
+            px = x if d == 0 or y != py else x + 1
+            while x > left and y > top and a[x - 1] == b[y - 1]:
+                x -= 1
+                y -= 1
+            vb[c] = y
+            if not delta & 1 and -d <= k <= d and -height <= k <= width and x <= vf[k]:
+                return (x, y), (px, py)
+    return None
+
+
+def _myers_path(a, b, left, top, right, bottom):
+    if left == right and top == bottom:
+        return None
+    if left == right or top == bottom:
+        # Pure insertion or deletion: nothing to search
+        return [(left, top), (right, bottom)]
+    snake = _middle_snake(a, b, left, top, right, bottom)
+    if snake is None:
+        # Over budget: report the whole box as one change
+        return [(left, top), (right, bottom)]
+    start, finish = snake
+    head = _myers_path(a, b, left, top, start[0], start[1]) or [start]
+    tail = _myers_path(a, b, finish[0], finish[1], right, bottom) or [finish]
+    return head + tail
+
+
+def myers_diff(a, b):
+    """Diff two sequences of hashable items in linear space.
+
+    Returns opcodes in difflib's (tag, i1, i2, j1, j2) format. Common leading and
+    trailing items are trimmed first, so small edits to a large file stay cheap.
+    """
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+
+    blocks = []
+    if prefix:
+        blocks.append((0, 0, prefix))
+    path = _myers_path(a, b, prefix, prefix, n - suffix, m - suffix) or []
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        # Each step is a diagonal run, at most one insert or delete, then another diagonal run
+        for _ in range(2):
+            run = 0
+            while x1 + run < x2 and y1 + run < y2 and a[x1 + run] == b[y1 + run]:
+                run += 1
+            if run:
+                blocks.append((x1, y1, run))
+                x1 += run
+                y1 += run
+            if x2 - x1 < y2 - y1:
+                y1 += 1
+            elif x2 - x1 > y2 - y1:
+                x1 += 1
+    if suffix:
+        blocks.append((n - suffix, m - suffix, suffix))
+
+    opcodes = []
+    i = j = 0
+    for bi, bj, size in blocks + [(n, m, 0)]:
+        if i < bi and j < bj:
+            opcodes.append(("replace", i, bi, j, bj))
+        elif i < bi:
+            opcodes.append(("delete", i, bi, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, bi, j, bj))
+        if size:
+            if opcodes and opcodes[-1][0] == "equal":
+                tag, i1, _, j1, _ = opcodes.pop()
+                opcodes.append(("equal", i1, bi + size, j1, bj + size))
+            else:
+                opcodes.append(("equal", bi, bi + size, bj, bj + size))
+        i, j = bi + size, bj + size
+    return opcodes
+
+
+def diff_markers(opcodes, line_count):
+    """Map current (1-based) line numbers to gutter marker tags for a list of opcodes"""
+    markers = {}
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "insert":
+            for line in range(j1 + 1, j2 + 1):
+                markers[line] = "diff_added"
+        elif tag == "replace":
+            for line in range(j1 + 1, j2 + 1):
+                markers[line] = "diff_changed"
+        elif tag == "delete":
+            markers.setdefault(max(1, min(j1 + 1, line_count)), "diff_deleted")
+    return markers
+
+
+WATCH_INTERVAL = 1.0
+WATCH_POLL_MS = 500
+
+
+def file_signature(path):
+    """Cheap change fingerprint of a file: (mtime_ns, size, inode)"""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class FileWatcher:
+    """Polls os.stat for every watched path on one background thread.
+
+    Only metadata is read, so the cost is a stat call per file per interval no
+    matter how large the files are. Changes are queued as (path, signature) for
+    the Tk thread to pick up; signature is None when the file disappeared.
+    """
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self.changes = queue.Queue()
+        self._paths = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, path, signature):
+        with self._lock:
+            self._paths[path] = signature
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, path):
+        with self._lock:
+            self._paths.pop(path, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                watched = list(self._paths.items())
+            for path, signature in watched:
+                try:
+                    current = file_signature(path)
+                except OSError:
+                    current = None
+                if current == signature:
+                    continue
+                with self._lock:
+                    if self._paths.get(path) != signature:
+                        continue
+                    self._paths[path] = current
+                self.changes.put((path, current))
+
+
+FILE_WATCHER = FileWatcher()
+
+
+PY_SYMBOL_RE = re.compile(r'^\s*(?:async\s+)?(def|class)\s+([A-Za-z_]\w*)')
+JAVA_TYPE_RE = re.compile(r'^\s*(?:(?:public|private|protected|static|final|abstract)\s+)*(class|interface|enum)\s+([A-Za-z_]\w*)')
+JAVA_METHOD_RE = re.compile(
+    r'^\s*(?:(?:public|private|protected|static|final|abstract|synchronized|native)\s+)*'
+    r'([A-Za-z_][\w<>\[\],\s]*?)\s+([A-Za-z_]\w*)\s*\([^)]*\)\s*(?:throws\s+[\w.,\s]+)?\s*\{?\s*$'
+)
+
+
+def line_symbol(line, lang):
+    """The (kind, name) defined on a line, or None"""
+    if lang == "Python":
+        match = PY_SYMBOL_RE.match(line)
+        return (match.group(1), match.group(2)) if match else None
+    if lang == "Java":
+        match = JAVA_TYPE_RE.match(line)
+        if match:
+            return match.group(1), match.group(2)
+        match = JAVA_METHOD_RE.match(line)
+        if match and match.group(2) not in JAVA_KEYWORDS and match.group(1).split()[-1] not in ("return", "new", "else", "throw"):
+            return "method", match.group(2)
+    return None
+
+
+def fuzzy_score(query, candidate):
+    """Score candidate for query as an in-order subsequence match, or None if it doesn't match"""
+    if not query:
+        return 0
+    lowered = candidate.lower()
+    score = 0
+    pos = prev = -1
+    for ch in query.lower():
+        pos = lowered.find(ch, pos + 1)
+        if pos == -1:
+            return None
+        score += 1
+        if pos == prev + 1:
+            score += 2
+        if pos == 0 or candidate[pos - 1] == '_' or candidate[pos].isupper():
+            score += 3
+        prev = pos
+    return score
+
+
+SEARCH_MAX_RESULTS = 10000
+SEARCH_POLL_MS = 50
+
+
+def gitignore_regex(pattern):
+    """Translate one .gitignore glob into a regex over '/'-separated paths relative to its directory"""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if ch == "*":
+            parts.append("[^/]*")
+        elif ch == "?":
+            parts.append("[^/]")
+        elif ch == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(ch))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif ch == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(ch))
+        i += 1
+    return re.compile(("^" if anchored else "^(?:.*/)?") + "".join(parts) + "$")
+
+
+def read_gitignore(path, base):
+    """Rules (base, regex, negate, dir_only) from one .gitignore file"""
+    rules = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line:
+            rules.append((base, gitignore_regex(line), negate, dir_only))
+    return rules
+
+
+def is_ignored(rel_path, is_dir, rules):
+    ignored = False
+    for base, regex, negate, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            sub = rel_path[len(base) + 1:]
+        else:
+            sub = rel_path
+        if regex.match(sub):
+            ignored = not negate
+    return ignored
+
+
+def find_repo_root(path):
+    """The nearest directory at or above path that contains .git, or None"""
+    current = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def walk_project(root):
+    """Yield the files under root, skipping .git and anything excluded by .gitignore files.
+
+    Inside a git repository, .git/info/exclude and the .gitignore files between the
+    repository root and root apply too, and all rules match paths relative to the repository.
+    """
+    root = os.path.abspath(root)
+    top = find_repo_root(root) or root
+    prefix = os.path.relpath(root, top).replace(os.sep, "/") if top != root else ""
+    rules = read_gitignore(os.path.join(top, ".git", "info", "exclude"), "")
+    if prefix:
+        parts = prefix.split("/")
+        for depth in range(len(parts)):
+            # root's own .gitignore is read by the walk below
+            rules += read_gitignore(os.path.join(top, *parts[:depth], ".gitignore"), "/".join(parts[:depth]))
+    stack = [(prefix, rules)]
+    while stack:
+        rel_dir, rules = stack.pop()
+        directory = os.path.join(top, rel_dir) if rel_dir else top
+        if os.path.isfile(os.path.join(directory, ".gitignore")):
+            rules = rules + read_gitignore(os.path.join(directory, ".gitignore"), rel_dir)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.name == ".git":
+                continue
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_ignored(rel_path, is_dir, rules):
+                continue
+            if is_dir:
+                subdirs.append((rel_path, rules))
+            elif entry.is_file():
+                yield entry.path
+        stack.extend(reversed(subdirs))
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_search(pattern, ignore_case):
+    """Compile a search pattern: bytes for the fast mmap scan when the pattern is plain ASCII, str otherwise.
+
+    Non-ASCII text would turn into per-byte classes and escapes like \\u don't exist in bytes
+    patterns, so those search decoded text instead. Raises re.error for an invalid pattern.
+    """
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    if pattern.isascii():
+        try:
+            return re.compile(pattern.encode("ascii"), flags)
+        except re.error:
+            pass
+    return re.compile(pattern, flags)
+
+
+def search_file(path, regex, limit=200):
+    """(line, col, text) for each line of path matching regex; binary files are skipped"""
+    results = []
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return results
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"\0", 0, 8192) != -1:
+                    return results
+                if isinstance(regex.pattern, bytes):
+                    data, newline = mm, b"\n"
+                else:
+                    data, newline = mm[:].decode("utf-8", "replace"), "\n"
+                line = 1
+                counted = 0
+                last_line = 0
+                for match in regex.finditer(data):
+                    start = match.start()
+                    line += data[counted:start].count(newline)
+                    counted = start
+                    if line == last_line:
+                        continue
+                    last_line = line
+                    line_start = data.rfind(newline, 0, start) + 1
+                    line_end = data.find(newline, start)
+                    if line_end == -1:
+                        line_end = len(data)
+                    text = data[line_start:min(line_end, line_start + 300)]
+                    if isinstance(text, bytes):
+                        text = text.decode("utf-8", "replace")
+                    results.append((line, start - line_start, text.rstrip("\r")))
+                    if len(results) >= limit:
+                        break
+    except (OSError, ValueError):
+        pass
+    return results
+
+
+def search_files(paths, pattern, ignore_case):
+    """Process-pool task: search a batch of files, returning (path, matches) for files that match"""
+    regex = _compile_search(pattern, ignore_case)
+    found = []
+    for path in paths:
+        matches = search_file(path, regex)
+        if matches:
+            found.append((path, matches))
+    return found
+
+
+class ProjectSearch:
+    """Walks a tree and greps it in a process pool, streaming (path, matches) tuples into a queue.
+
+    Small first batches get early results on screen quickly; cancel() stops the walk and
+    drops batches that have not started yet. None is queued once the search has ended.
+    """
+
+    def __init__(self, root, pattern, ignore_case, pool, batch_size=64):
+        self.root = root
+        self.pattern = pattern
+        self.ignore_case = ignore_case
+        self.pool = pool
+        self.batch_size = batch_size
+        self.results = queue.Queue()
+        self._cancelled = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name="project-search", daemon=True).start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _collect(self, futures):
+        for future in futures:
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                self.results.put(("error", str(future.exception())))
+                continue
+            for item in future.result():
+                self.results.put(item)
+
+    def _run(self):
+        pending = set()
+        try:
+            batch = []
+            batch_size = 8
+            for path in walk_project(self.root):
+                if self.cancelled:
+                    break
+                batch.append(path)
+                if len(batch) >= batch_size:
+                    pending.add(self.pool.submit(search_files, batch, self.pattern, self.ignore_case))
+                    batch = []
+                    batch_size = self.batch_size
+                    done = {f for f in pending if f.done()}
+                    pending -= done
+                    self._collect(done)
+            if batch and not self.cancelled:
+                pending.add(self.pool.submit(search_files, batch, self.pattern, self.ignore_case))
+            while pending and not self.cancelled:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                self._collect(done)
+        except Exception as e:
+            self.results.put(("error", str(e)))
+        finally:
+            for future in pending:
+                future.cancel()
+            self.results.put(None)
 
 
 class SyntaxFixer(tk.Tk):
@@ -86,6 +1751,28 @@ class SyntaxFixer(tk.Tk):
         self.last_save_time = None
         self.language = tk.StringVar(value="Python")
         self.auto_correct_enabled = tk.BooleanVar(value=True)
+        self.token_cache = TokenCache()
+        self.engine = CorrectionClient()
+        self.journal = None
+        self._journal_base = (text_digest(""), "")
+        self._journal_paused = True
+        self.diff_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diff")
+        self.diff_markers = {}
+        self._line_ids = {}
+        self._saved_ids = []
+        self._current_ids = []
+        self._diff_job = None
+        self._diff_running = False
+        self._diff_dirty = False
+        self._disk_state = None
+        self._line_symbols = [None]
+        self._applied_tags = [None]
+        self._line_states = [None]
+        self._dirty_lines = None
+        self._highlight_reset = False
+        self.search_pool = None
+        self.recorder = None
+        self.recording = tk.BooleanVar(value=False)
         self.current_line = 1
         self.current_col = 1
        
@@ -93,6 +1780,10 @@ class SyntaxFixer(tk.Tk):
         self.create_menu()
         self.create_widgets()
         self.create_status_bar()
+        self.edit_listeners.append(self.journal_edit)
+        self.edit_listeners.append(self.diff_edit)
+        self.edit_listeners.append(self.outline_edit)
+        self.edit_listeners.append(self.highlight_edit)
        
        
         self.bind_shortcuts()
@@ -108,6 +1799,12 @@ class SyntaxFixer(tk.Tk):
        
        
         self.show_welcome()
+        self.reset_journal(self.text.get("1.0", "end-1c"), checkpoint=True)
+        self.set_diff_base(self.text.get("1.0", "end-1c"))
+        self.after(JOURNAL_FLUSH_MS, self.journal_tick)
+        self.after(WATCH_POLL_MS, self.check_external_changes)
+
+        self.after_idle(PY_PACKAGES.load_async)
 
     def master_key_release_handler(self, event):
     # Hide suggestions only for specific keys:
@@ -125,6 +1822,9 @@ class SyntaxFixer(tk.Tk):
     def on_language_switch(self):
    
         lang = self.language.get()
+        self.rebuild_outline()
+        self.mark_dirty_lines(1, len(self._applied_tags))
+        self.highlight_syntax()
         status = "ON" if self.auto_correct_enabled.get() else "OFF"
         self.status_bar.config(
             text=f"Auto-Correction: {status} | Language: {lang} | Line: {self.current_line}, Col: {self.current_col}"
@@ -142,7 +1842,7 @@ class SyntaxFixer(tk.Tk):
 #• Modern dark theme UI
 
 #Start typing or open a file to begin!\n"""
-        self.text.insert("1.0", welcome_text)
+        self.set_buffer(welcome_text)
         self.text.tag_add("comment", "1.0", "end")
    
     def create_menu(self):
@@ -167,6 +1867,8 @@ class SyntaxFixer(tk.Tk):
         edit_menu.add_command(label="Copy", command=self.copy, accelerator="Ctrl+C")
         edit_menu.add_command(label="Paste", command=self.paste, accelerator="Ctrl+V")
         edit_menu.add_separator()
+        edit_menu.add_command(label="Find in Files...", command=self.show_find_in_files, accelerator="Ctrl+Shift+F")
+        edit_menu.add_separator()
         edit_menu.add_checkbutton(label="Auto-Correction", variable=self.auto_correct_enabled,
                                 command=self.toggle_auto_correct, accelerator="Ctrl+Alt+C")
         edit_menu.add_separator()
@@ -179,23 +1881,30 @@ class SyntaxFixer(tk.Tk):
         view_menu = tk.Menu(menubar, tearoff=0)
         view_menu.add_command(label="Increase Font Size", command=lambda: self.change_font_size(1), accelerator="Ctrl++")
         view_menu.add_command(label="Decrease Font Size", command=lambda: self.change_font_size(-1), accelerator="Ctrl+-")
+        view_menu.add_separator()
+        view_menu.add_command(label="Compare with Saved", command=self.show_saved_diff, accelerator="Ctrl+D")
+        view_menu.add_command(label="Go to Symbol...", command=self.show_symbol_picker, accelerator="Ctrl+R")
         menubar.add_cascade(label="View", menu=view_menu)
        
        
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="About", command=self.show_about)
         help_menu.add_command(label="Keyboard Shortcuts", command=self.show_shortcuts)
+        help_menu.add_separator()
+        help_menu.add_checkbutton(label="Record Session...", variable=self.recording, command=self.toggle_recording)
         menubar.add_cascade(label="Help", menu=help_menu)
        
         self.config(menu=menubar)
 
     def undo(self):
+        self.record_event("edit_undo")
         try:
             self.text.edit_undo()
         except:
             pass
 
     def redo(self):
+        self.record_event("edit_redo")
         try:
             self.text.edit_redo()
         except:
@@ -224,6 +1933,9 @@ class SyntaxFixer(tk.Tk):
                                   border=0, background="#333333", foreground="#aaaaaa",
                                   font=('Consolas', 12), state='disabled')
         self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
+        self.line_numbers.tag_configure("diff_added", background="#2e5c34", foreground="#ffffff")
+        self.line_numbers.tag_configure("diff_changed", background="#1f4e79", foreground="#ffffff")
+        self.line_numbers.tag_configure("diff_deleted", background="#7a2e2e", foreground="#ffffff")
        
        
         text_frame = ttk.Frame(main_frame)
@@ -244,7 +1956,19 @@ class SyntaxFixer(tk.Tk):
        
         self.text.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
         self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-       
+        self.install_edit_hook()
+       
+        # Session recorder sees every event first and never breaks the chain
+        self.text.bindtags(("SessionRecorder",) + self.text.bindtags())
+        # Each binding checks for a recorder first, so recording costs nothing while it is off
+        self.bind_class("SessionRecorder", "<Key>", lambda e: self.recording_on() and self.record_event("key", e.keysym, e.char, e.state))
+        self.bind_class("SessionRecorder", "<KeyRelease>", lambda e: self.recording_on() and self.record_event("release", e.keysym, e.char, e.state))
+        self.bind_class("SessionRecorder", "<<Paste>>", lambda e: self.recording_on() and self.record_event("paste", self.clipboard_text()))
+        # Shortcuts matching these virtual events arrive here instead of as <Key>
+        for virtual in ("<<Cut>>", "<<Undo>>", "<<Redo>>"):
+            self.bind_class("SessionRecorder", virtual, lambda e, kind=virtual[2:-2].lower(): self.recording_on() and self.record_event(kind))
+        self.bind_class("SessionRecorder", "<Button-1>", lambda e: self.recording_on() and self.record_event("click", self.text.index(f"@{e.x},{e.y}")))
+
         # Unified KeyRelease handler
         self.text.bind("<KeyRelease>", self.master_key_release_handler)
 
@@ -258,8 +1982,707 @@ class SyntaxFixer(tk.Tk):
         self.text.bind("<Configure>", self.update_line_numbers)
         self.text.bind("<Motion>", self.update_cursor_position)
 
-   
-   
+
+    # Runs in Tcl so that failing commands stay ordinary Tcl errors: Tk's class bindings rely on
+    # catch around "get sel.first" or "index anchor", which a Python command can't honour
+    TEXT_PROXY = """
+proc %(widget)s args {
+    set op [lindex $args 0]
+    if {$op eq "insert" && [llength $args] >= 3} {
+        set last [%(orig)s index end-1c]
+        set start [%(orig)s index [lindex $args 1]]
+        if {[%(orig)s compare $start > $last]} {set start $last}
+        set result [%(orig)s {*}$args]
+        %(notify)s insert $start {*}[lrange $args 2 end]
+        return $result
+    }
+    if {$op eq "delete" && [llength $args] in {2 3}} {
+        set last [%(orig)s index end-1c]
+        set start [%(orig)s index [lindex $args 1]]
+        if {[llength $args] == 3} {
+            set end [%(orig)s index [lindex $args 2]]
+        } else {
+            set end [%(orig)s index "[lindex $args 1]+1c"]
+        }
+        if {[%(orig)s compare $start > $last]} {set start $last}
+        if {[%(orig)s compare $end > $last]} {set end $last}
+        set result [%(orig)s {*}$args]
+        if {[%(orig)s compare $start < $end]} {%(notify)s delete $start $end}
+        return $result
+    }
+    set result [%(orig)s {*}$args]
+    if {$op in {insert delete replace} || ($op eq "edit" && [lindex $args 1] in {undo redo})} {
+        %(notify)s reset
+    }
+    return $result
+}
+"""
+
+    def install_edit_hook(self):
+        """Route the text widget's Tcl command through a proxy that reports every successful insert/delete"""
+        self.edit_listeners = []
+        self._text_cmd = self.text._w + "_orig"
+        self.tk.call("rename", self.text._w, self._text_cmd)
+        notify = self.register(self._text_edited)
+        self.tk.eval(self.TEXT_PROXY % {"widget": self.text._w, "orig": self._text_cmd, "notify": notify})
+
+    @staticmethod
+    def _parse_index(index):
+        line, col = str(index).split('.')
+        return int(line), int(col)
+
+    def _text_edited(self, op, *args):
+        if op == "insert":
+            start = self._parse_index(args[0])
+            text = "".join(args[1::2])
+            lines = text.split('\n')
+            if len(lines) == 1:
+                end = (start[0], start[1] + len(text))
+            else:
+                end = (start[0] + len(lines) - 1, len(lines[-1]))
+            self._notify_edit("insert", start, end, text)
+        elif op == "delete":
+            self._notify_edit("delete", self._parse_index(args[0]), self._parse_index(args[1]), "")
+        else:
+            # Changes applied inside Tk (undo/redo, multi-range edits) are reported as a full reset
+            self._notify_edit("reset", None, None, "")
+
+    def _notify_edit(self, op, start, end, text):
+        for listener in self.edit_listeners:
+            listener(op, start, end, text)
+
+    def journal_edit(self, op, start, end, text):
+        if self._journal_paused:
+            return
+        if self.journal is None:
+            digest, checkpoint = self._journal_base
+            self.journal = EditJournal(JOURNAL_DIR, journal_key(self.filename), digest, checkpoint)
+        if op == "insert":
+            self.journal.record_insert(start, text)
+        elif op == "delete":
+            self.journal.record_delete(start, end)
+        else:
+            self.journal_reset()
+
+    def journal_reset(self):
+        """Journal a change applied inside Tk (undo/redo) as records for the lines that differ.
+
+        Runs before diff_edit, so _current_ids still describes the buffer before the change.
+        """
+        old = self._current_ids
+        lines = self.text.get("1.0", "end-1c").split('\n')
+        new = self._intern_lines(lines)
+        n, m = len(old), len(new)
+        prefix = 0
+        while prefix < min(n, m) and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < min(n, m) - prefix and old[n - 1 - suffix] == new[m - 1 - suffix]:
+            suffix += 1
+        if prefix == n == m:
+            return
+        if suffix:
+            # Replace whole lines, from the start of the first changed line to the start of the suffix
+            start, end = (prefix + 1, 0), (n - suffix + 1, 0)
+            text = "".join(line + '\n' for line in lines[prefix:m - suffix])
+        else:
+            # The change runs to the end of the buffer
+            last = next(line for line, i in self._line_ids.items() if i == old[-1])
+            start = (prefix, len(lines[prefix - 1])) if prefix else (1, 0)
+            end = (n, len(last))
+            text = "".join('\n' + line for line in lines[prefix:]) if prefix else '\n'.join(lines)
+        if start < end:
+            self.journal.record_delete(start, end)
+        if text:
+            self.journal.record_insert(start, text)
+
+    def journal_tick(self):
+        if self.journal is not None:
+            self.journal.flush()
+            if self.journal.lost or self.journal.size > JOURNAL_COMPACT_BYTES:
+                self.journal.compact(self.text.get("1.0", "end-1c"))
+        self.after(JOURNAL_FLUSH_MS, self.journal_tick)
+
+    def reset_journal(self, base_text, checkpoint=False):
+        """Start a fresh journal on top of base_text, dropping the previous one"""
+        self.discard_journal()
+        JOURNAL_WRITER.submit(EditJournal.remove, JOURNAL_DIR, journal_key(self.filename))
+        self._journal_base = (text_digest(base_text), base_text if checkpoint else None)
+        self._journal_paused = False
+
+    def discard_journal(self):
+        if self.journal is not None:
+            self.journal.discard()
+            self.journal = None
+
+    def set_buffer(self, content):
+        """Replace the whole buffer without journaling it as an edit"""
+        paused, self._journal_paused = self._journal_paused, True
+        try:
+            self.text.delete(1.0, tk.END)
+            self.text.insert(tk.END, content)
+        finally:
+            self._journal_paused = paused
+
+    def offer_recovery(self, filepath, saved_text):
+        """Offer the unsaved changes of editors that exited without saving filepath, newest first"""
+        name = os.path.basename(filepath)
+        for key in orphaned_journals(JOURNAL_DIR, journal_prefix(filepath)):
+            recovered = EditJournal.recover(JOURNAL_DIR, key, saved_text)
+            if recovered is not None and recovered not in (saved_text, saved_text[:-1]):
+                if messagebox.askyesno("Recover Changes", f"SyntaxFixer found unsaved changes to {name} from a previous session.\n\nRecover them?"):
+                    EditJournal.remove(JOURNAL_DIR, key)
+                    return recovered
+            EditJournal.remove(JOURNAL_DIR, key)
+        return None
+
+    def recover_untitled(self):
+        """Offer each untitled buffer left behind by a crashed editor until one is accepted"""
+        for key in orphaned_journals(JOURNAL_DIR, "untitled-"):
+            recovered = EditJournal.recover(JOURNAL_DIR, key)
+            if recovered and messagebox.askyesno("Recover Changes", "SyntaxFixer found an unsaved untitled file from a previous session.\n\nRecover it?"):
+                EditJournal.remove(JOURNAL_DIR, key)
+                self.set_buffer(recovered)
+                self.reset_journal(recovered, checkpoint=True)
+                self.set_diff_base("")
+                self.unsaved_changes = True
+                self.update_status_bar()
+                self.update_line_numbers()
+                self.highlight_syntax()
+                # Any older ones stay on disk for the next editor to offer
+                return
+            EditJournal.remove(JOURNAL_DIR, key)
+
+    def poll_future(self, future, callback, interval=30):
+        """Hand a worker's future back to callback on the Tk thread once it completes"""
+        if future.done():
+            callback(future)
+        else:
+            self.after(interval, self.poll_future, future, callback, interval)
+
+    def _intern_lines(self, lines):
+        ids = self._line_ids
+        return [ids.setdefault(line, len(ids)) for line in lines]
+
+    def _prune_line_ids(self):
+        """Renumber the intern table down to the lines still in the saved or current buffer"""
+        live = set(self._saved_ids)
+        live.update(self._current_ids)
+        if len(self._line_ids) <= 2 * len(live):
+            return
+        table, remap = {}, {}
+        for line, i in self._line_ids.items():
+            if i in live:
+                remap[i] = table[line] = len(table)
+        self._line_ids = table
+        self._saved_ids = [remap[i] for i in self._saved_ids]
+        self._current_ids = [remap[i] for i in self._current_ids]
+
+    def set_diff_base(self, saved_text):
+        """Record the saved content that the gutter markers compare against"""
+        self._line_ids = {}
+        self._saved_ids = self._intern_lines(saved_text.split('\n'))
+        self._current_ids = self._intern_lines(self.text.get("1.0", "end-1c").split('\n'))
+        self.schedule_diff()
+
+    def edited_lines(self, op, start, end):
+        """For an edit notification, the (first, stop) slice of old line indexes it replaced and the new lines.
+
+        Returns None for a reset, when per-line state has to be rebuilt from the whole buffer.
+        """
+        if op == "insert":
+            return start[0] - 1, start[0], self.text.get(f"{start[0]}.0", f"{end[0]}.end").split('\n')
+        if op == "delete":
+            return start[0] - 1, end[0], [self.text.get(f"{start[0]}.0", f"{start[0]}.end")]
+        return None
+
+    def diff_edit(self, op, start, end, text):
+        # Re-hash only the lines touched by the edit and splice them into place
+        edited = self.edited_lines(op, start, end)
+        if edited is None:
+            self._current_ids = self._intern_lines(self.text.get("1.0", "end-1c").split('\n'))
+        else:
+            first, stop, lines = edited
+            self._current_ids[first:stop] = self._intern_lines(lines)
+        self.schedule_diff()
+
+    def outline_edit(self, op, start, end, text):
+        lang = self.language.get()
+        edited = self.edited_lines(op, start, end)
+        if edited is None:
+            self.rebuild_outline()
+        else:
+            first, stop, lines = edited
+            self._line_symbols[first:stop] = [line_symbol(line, lang) for line in lines]
+
+    def rebuild_outline(self):
+        lang = self.language.get()
+        self._line_symbols = [line_symbol(line, lang) for line in self.text.get("1.0", "end-1c").split('\n')]
+
+    def symbols(self):
+        """(line, kind, name) for every symbol in the buffer, in document order"""
+        return [(i, sym[0], sym[1]) for i, sym in enumerate(self._line_symbols, 1) if sym is not None]
+
+    def show_symbol_picker(self, event=None):
+        """Quick-open dialog listing defs/classes/methods with fuzzy filtering"""
+        symbols = self.symbols()
+        picker = Toplevel(self)
+        picker.title("Go to Symbol")
+        picker.geometry("480x360")
+        picker.configure(bg="#2d2d2d")
+        picker.transient(self)
+        query = tk.StringVar()
+        entry = ttk.Entry(picker, textvariable=query, font=("Consolas", 11))
+        entry.pack(fill=tk.X, padx=5, pady=5)
+        listbox = Listbox(picker, font=("Consolas", 11), bg="#23272e", fg="#fafafa", highlightthickness=0, border=0)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        shown = []
+
+        def refresh(*args):
+            scored = []
+            for line, kind, name in symbols:
+                score = fuzzy_score(query.get(), name)
+                if score is not None:
+                    scored.append((-score, line, kind, name))
+            scored.sort()
+            shown[:] = [(line, kind, name) for _, line, kind, name in scored]
+            listbox.delete(0, tk.END)
+            for line, kind, name in shown:
+                listbox.insert(tk.END, f"{kind:<9} {name}  :{line}")
+            if shown:
+                listbox.selection_set(0)
+
+        def move(delta):
+            selected = listbox.curselection()
+            index = max(0, min(len(shown) - 1, (selected[0] if selected else -1) + delta))
+            listbox.selection_clear(0, tk.END)
+            listbox.selection_set(index)
+            listbox.see(index)
+            return "break"
+
+        def pick(event=None):
+            selected = listbox.curselection()
+            if selected:
+                self.goto_line(shown[selected[0]][0])
+            picker.destroy()
+
+        query.trace_add("write", refresh)
+        entry.bind("<Return>", pick)
+        entry.bind("<Down>", lambda e: move(1))
+        entry.bind("<Up>", lambda e: move(-1))
+        entry.bind("<Escape>", lambda e: picker.destroy())
+        listbox.bind("<Double-Button-1>", pick)
+        refresh()
+        entry.focus_set()
+
+    def show_find_in_files(self):
+        """Search every file under the current file's directory, streaming matches into a panel"""
+        root = os.path.dirname(os.path.abspath(self.filename)) if self.filename else os.getcwd()
+        if self.search_pool is None:
+            # spawn keeps workers independent of Tk and the editor's threads; warm them up now
+            self.search_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+            self.search_pool.submit(int)
+
+        panel = Toplevel(self)
+        panel.title(f"Find in Files - {root}")
+        panel.geometry("900x500")
+        panel.configure(bg="#2d2d2d")
+        controls = ttk.Frame(panel)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        query = tk.StringVar()
+        use_regex = tk.BooleanVar(value=False)
+        match_case = tk.BooleanVar(value=False)
+        entry = ttk.Entry(controls, textvariable=query, font=("Consolas", 11))
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Checkbutton(controls, text="Regex", variable=use_regex).pack(side=tk.LEFT, padx=4)
+        ttk.Checkbutton(controls, text="Match case", variable=match_case).pack(side=tk.LEFT, padx=4)
+        listbox = Listbox(panel, font=("Consolas", 10), bg="#23272e", fg="#fafafa", highlightthickness=0, border=0)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=5)
+        status = ttk.Label(panel, text=f"Searching in {root}", anchor=tk.W)
+        status.pack(fill=tk.X, padx=5, pady=(2, 5))
+        locations = []
+        state = {"search": None, "files": 0, "started": 0.0, "error": None}
+
+        def poll(search):
+            if search is not state["search"]:
+                return
+            for _ in range(500):
+                try:
+                    item = search.results.get_nowait()
+                except queue.Empty:
+                    panel.after(SEARCH_POLL_MS, poll, search)
+                    return
+                if item is None:
+                    elapsed = time.perf_counter() - state["started"]
+                    verb = "Stopped" if search.cancelled else "Found"
+                    summary = f"{verb}: {len(locations)} matches in {state['files']} files ({elapsed:.2f}s)"
+                    if state["error"]:
+                        summary = f"Search failed: {state['error']} | {summary}"
+                    status.config(text=summary)
+                    return
+                if item[0] == "error":
+                    state["error"] = item[1]
+                    status.config(text=f"Search failed: {item[1]}")
+                    continue
+                path, matches = item
+                state["files"] += 1
+                rel = os.path.relpath(path, root)
+                for line, col, text in matches:
+                    locations.append((path, line, col))
+                    listbox.insert(tk.END, f"{rel}:{line}: {text.strip()}")
+                if len(locations) >= SEARCH_MAX_RESULTS:
+                    search.cancel()
+            panel.after(1, poll, search)
+
+        def start(event=None):
+            stop()
+            text = query.get()
+            if not text:
+                return
+            pattern = text if use_regex.get() else re.escape(text)
+            try:
+                # The exact compile the workers run, so a pattern they would reject is caught here
+                _compile_search(pattern, not match_case.get())
+            except re.error as e:
+                status.config(text=f"Invalid pattern: {e}")
+                return
+            listbox.delete(0, tk.END)
+            locations.clear()
+            state["files"] = 0
+            state["error"] = None
+            state["started"] = time.perf_counter()
+            search = ProjectSearch(root, pattern, not match_case.get(), self.search_pool)
+            state["search"] = search
+            status.config(text="Searching...")
+            search.start()
+            poll(search)
+
+        def stop(event=None):
+            if state["search"] is not None:
+                state["search"].cancel()
+
+        def open_selected(event=None):
+            selected = listbox.curselection()
+            if selected:
+                path, line, col = locations[selected[0]]
+                self.open_location(path, line)
+
+        def close():
+            stop()
+            state["search"] = None
+            panel.destroy()
+
+        ttk.Button(controls, text="Search", command=start).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Stop", command=stop).pack(side=tk.LEFT, padx=2)
+        entry.bind("<Return>", start)
+        panel.bind("<Escape>", stop)
+        listbox.bind("<ButtonRelease-1>", open_selected)
+        listbox.bind("<Return>", open_selected)
+        panel.protocol("WM_DELETE_WINDOW", close)
+        entry.focus_set()
+
+    def open_location(self, path, line):
+        if not (self.filename and os.path.abspath(self.filename) == os.path.abspath(path)):
+            if self.unsaved_changes and not self.prompt_save():
+                return
+            if not self.load_file(path):
+                return
+        self.goto_line(line)
+
+    def clipboard_text(self):
+        try:
+            return self.clipboard_get()
+        except tk.TclError:
+            return ""
+
+    def recording_on(self):
+        return self.recorder is not None
+
+    def record_event(self, kind, *data):
+        # Cursor and selection go with every event, since drags and selection keys aren't replayed
+        if self.recorder is not None:
+            selection = [str(index) for index in self.text.tag_ranges("sel")]
+            self.recorder.record(kind, self.text.index(tk.INSERT), selection, *data)
+
+    def toggle_recording(self):
+        if self.recorder is not None:
+            self.stop_recording()
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".sftrace", filetypes=[("SyntaxFixer Trace", "*.sftrace")])
+        if not path:
+            self.recording.set(False)
+            return
+        content = self.text.get("1.0", "end-1c")
+        try:
+            self.recorder = SessionRecorder(path, {
+                "language": self.language.get(),
+                "auto_correct": self.auto_correct_enabled.get(),
+                "buffer_sha1": buffer_hash(content),
+                "buffer": content,
+                "cursor": self.text.index(tk.INSERT),
+                "recorded": datetime.now().isoformat(timespec="seconds"),
+            })
+        except OSError as e:
+            self.recording.set(False)
+            messagebox.showerror("Error", f"Failed to start recording:\n{str(e)}")
+            return
+        self.recording.set(True)
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        self.recording.set(False)
+        try:
+            recorder.close(self.text.get("1.0", "end-1c"))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to save recording:\n{str(e)}")
+            return
+        messagebox.showinfo("Session Recorded", f"Saved to {recorder.path}\n\nReplay with: python main.py --replay {recorder.path}")
+
+    def goto_line(self, line, col=0):
+        self.text.mark_set(tk.INSERT, f"{line}.{col}")
+        self.text.see(tk.INSERT)
+        self.text.focus_set()
+        self.update_line_numbers()
+
+    def schedule_diff(self):
+        if self._diff_job is not None:
+            self.after_cancel(self._diff_job)
+        self._diff_job = self.after(DIFF_DELAY_MS, self._start_diff)
+
+    def _start_diff(self):
+        self._diff_job = None
+        if self._diff_running:
+            self._diff_dirty = True
+            return
+        self._diff_running = True
+        self._diff_dirty = False
+        # Every version of every typed line gets interned; drop the ones no longer on either side
+        self._prune_line_ids()
+        future = self.diff_executor.submit(myers_diff, tuple(self._saved_ids), tuple(self._current_ids))
+        self.poll_future(future, self._finish_diff)
+
+    def _finish_diff(self, future):
+        self._diff_running = False
+        if self._diff_dirty:
+            self._start_diff()
+            return
+        if future.exception() is None:
+            self.diff_markers = diff_markers(future.result(), len(self._current_ids))
+            self.apply_diff_markers()
+
+    def apply_diff_markers(self):
+        for tag in ("diff_added", "diff_changed", "diff_deleted"):
+            self.line_numbers.tag_remove(tag, "1.0", tk.END)
+        ranges = {}
+        for line, tag in self.diff_markers.items():
+            ranges.setdefault(tag, []).extend((f"{line}.0", f"{line}.end"))
+        for tag, indices in ranges.items():
+            self.line_numbers.tag_add(tag, *indices)
+
+    def show_saved_diff(self):
+        """Open a side-by-side view of the on-disk file against the buffer"""
+        current = self.text.get("1.0", "end-1c")
+        saved_ids = tuple(self._saved_ids)
+        line_ids = self._line_ids
+        filename = self.filename
+
+        def compute():
+            if filename and os.path.exists(filename):
+                with open(filename, 'r', encoding='utf-8') as f:
+                    saved = f.read()
+                if saved.endswith('\n'):
+                    saved = saved[:-1]
+                saved_lines = saved.split('\n')
+                ids = {}
+                a = [ids.setdefault(line, len(ids)) for line in saved_lines]
+            else:
+                saved_lines = None
+                ids = line_ids
+                a = saved_ids
+            current_lines = current.split('\n')
+            b = [ids.get(line, -1 - i) for i, line in enumerate(current_lines)]
+            return saved_lines, current_lines, myers_diff(a, b)
+
+        self.config(cursor="watch")
+        self.poll_future(self.diff_executor.submit(compute), self._render_saved_diff)
+
+    def _render_saved_diff(self, future):
+        self.config(cursor="")
+        if future.exception() is not None:
+            messagebox.showerror("Error", f"Failed to compare with saved file:\n{future.exception()}")
+            return
+        saved_lines, current_lines, opcodes = future.result()
+        if saved_lines is None:
+            # Untitled buffer: the saved side is the content at the last save or load
+            reverse = {i: line for line, i in self._line_ids.items()}
+            saved_lines = [reverse[i] for i in self._saved_ids]
+
+        left, right = [], []
+        left_tags, right_tags = [], []
+        for tag, i1, i2, j1, j2 in opcodes:
+            old, new = saved_lines[i1:i2], current_lines[j1:j2]
+            rows = max(len(old), len(new))
+            for k in range(rows):
+                row = len(left) + 1
+                left.append(old[k] if k < len(old) else "")
+                right.append(new[k] if k < len(new) else "")
+                if tag != "equal":
+                    if k < len(old):
+                        left_tags.extend((f"{row}.0", f"{row}.0+1l"))
+                    if k < len(new):
+                        right_tags.extend((f"{row}.0", f"{row}.0+1l"))
+
+        window = Toplevel(self)
+        window.title(f"Compare with Saved - {os.path.basename(self.filename) if self.filename else 'New File'}")
+        window.geometry("1200x700")
+        window.configure(bg="#2d2d2d")
+        frame = ttk.Frame(window)
+        frame.pack(fill=tk.BOTH, expand=True)
+        panes = []
+        for column, (lines, ranges, color) in enumerate(((left, left_tags, "#5c2626"), (right, right_tags, "#264f2e"))):
+            pane = tk.Text(frame, wrap=tk.NONE, font=('Consolas', 11), bg="#1e1e1e", fg="#d4d4d4", border=0)
+            pane.insert("1.0", '\n'.join(lines))
+            pane.tag_configure("changed", background=color)
+            if ranges:
+                pane.tag_add("changed", *ranges)
+            pane.config(state=tk.DISABLED)
+            pane.grid(row=0, column=column, sticky="nsew")
+            panes.append(pane)
+        frame.columnconfigure(0, weight=1)
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(0, weight=1)
+
+        def scroll(*args):
+            for pane in panes:
+                pane.yview(*args)
+
+        def on_scroll(first, last):
+            y_scroll.set(first, last)
+            for pane in panes:
+                pane.yview_moveto(first)
+
+        y_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=scroll)
+        y_scroll.grid(row=0, column=2, sticky="ns")
+        for pane in panes:
+            pane.configure(yscrollcommand=on_scroll)
+
+    def watch_file(self):
+        """Remember the on-disk state of the current file and start watching it"""
+        if self._disk_state is not None:
+            FILE_WATCHER.unwatch(self._disk_state[0])
+            self._disk_state = None
+        if self.filename:
+            try:
+                signature = file_signature(self.filename)
+            except OSError:
+                return
+            self._disk_state = (self.filename, signature)
+            FILE_WATCHER.watch(self.filename, signature)
+
+    def changed_on_disk(self):
+        if self._disk_state is None or self._disk_state[0] != self.filename:
+            return False
+        try:
+            return file_signature(self.filename) != self._disk_state[1]
+        except OSError:
+            return False
+
+    def check_external_changes(self):
+        try:
+            while True:
+                path, signature = FILE_WATCHER.changes.get_nowait()
+                if self._disk_state is None or path != self._disk_state[0] or signature is None:
+                    continue
+                if signature == self._disk_state[1]:
+                    continue
+                # _disk_state only moves on once a reload lands; if the user declines, the old
+                # signature stays so save_file still asks before overwriting the external change
+                if not self.has_local_edits() or self.confirm_reload():
+                    self.reload_from_disk()
+        except queue.Empty:
+            pass
+        self.after(WATCH_POLL_MS, self.check_external_changes)
+
+    def has_local_edits(self):
+        """Whether the buffer differs from the content of the last save or load"""
+        return self._current_ids != self._saved_ids
+
+    def confirm_reload(self):
+        name = os.path.basename(self.filename)
+        return messagebox.askyesno("File Changed", f"{name} was changed by another program.\n\nReload it and discard your unsaved changes?")
+
+    def reload_from_disk(self):
+        """Bring the buffer in line with the file on disk by rewriting only the changed lines"""
+        filename = self.filename
+        snapshot = self.text.get("1.0", "end-1c")
+
+        def compute():
+            # Taken before reading, so a change racing the read still counts as unseen
+            signature = file_signature(filename)
+            with open(filename, 'r', encoding='utf-8') as f:
+                content = f.read()
+            ids = {}
+            old_lines = snapshot.split('\n')
+            new_lines = content.split('\n')
+            a = [ids.setdefault(line, len(ids)) for line in old_lines]
+            b = [ids.setdefault(line, len(ids)) for line in new_lines]
+            return signature, content, old_lines, new_lines, myers_diff(a, b)
+
+        def finish(future):
+            if future.exception() is not None:
+                messagebox.showerror("Error", f"Failed to reload file:\n{future.exception()}")
+                return
+            if self.filename != filename:
+                return
+            if self.text.get("1.0", "end-1c") != snapshot:
+                # The buffer moved on while the diff ran; anything typed since is only discarded on request
+                if not self.has_local_edits() or self.confirm_reload():
+                    self.reload_from_disk()
+                return
+            signature, content, old_lines, new_lines, opcodes = future.result()
+            self.apply_line_opcodes(old_lines, new_lines, opcodes)
+            self._disk_state = (filename, signature)
+            FILE_WATCHER.watch(filename, signature)
+            # <<Modified>> from the rewrite is handled later; clear the flag so it doesn't mark the buffer unsaved
+            self.text.edit_modified(False)
+            self.reset_journal(content)
+            self.set_diff_base(content)
+            self.unsaved_changes = False
+            self.last_save_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.update_line_numbers()
+
+        self.poll_future(self.diff_executor.submit(compute), finish)
+
+    def apply_line_opcodes(self, old_lines, new_lines, opcodes):
+        """Rewrite the changed line ranges in place, keeping marks, scroll position and undo history"""
+        changes = [op for op in opcodes if op[0] != "equal"]
+        if not changes:
+            return
+        self.text.mark_set("reload_top", "@0,0")
+        self.text.mark_gravity("reload_top", tk.LEFT)
+        self.text.edit_separator()
+        paused, self._journal_paused = self._journal_paused, True
+        try:
+            for tag, i1, i2, j1, j2 in reversed(changes):
+                block = new_lines[j1:j2]
+                if i2 < len(old_lines):
+                    self.text.delete(f"{i1 + 1}.0", f"{i2 + 1}.0")
+                    self.text.insert(f"{i1 + 1}.0", "".join(line + '\n' for line in block))
+                elif i1 > 0:
+                    # The range reaches the last line, which has no newline of its own
+                    start = f"{i1}.{len(old_lines[i1 - 1])}"
+                    self.text.delete(start, "end-1c")
+                    self.text.insert(start, "".join('\n' + line for line in block))
+                else:
+                    self.text.delete("1.0", "end-1c")
+                    self.text.insert("1.0", '\n'.join(block))
+        finally:
+            self._journal_paused = paused
+        self.text.edit_separator()
+        self.highlight_syntax()
+        self.text.yview("reload_top")
+        self.text.mark_unset("reload_top")
+
     def show_suggestions(self, event=None):
        cursor_pos = self.text.index(tk.INSERT)
        line_num, col_num = map(int, cursor_pos.split('.'))
@@ -270,21 +2693,7 @@ class SyntaxFixer(tk.Tk):
           self.hide_suggestions()
           return
        prefix = word_match.group(1)
-       lang = self.language.get()
-       if lang == "Python":
-          options = sorted(set(PY_KEYWORDS + PY_BUILTINS + PY_LIBRARIES))
-       elif lang == "Java":
-          options = sorted(JAVA_KEYWORDS | JAVA_BUILTINS)
-       else:
-          options = []
-
-    # FIXED: Case-insensitive and fuzzy match, works for 'System', 'println', etc.
-       matches = [w for w in options if w.lower().startswith(prefix.lower())]
-       if len(matches) < 5:
-          import difflib
-          extra = difflib.get_close_matches(prefix, options, n=5)
-          matches += [m for m in extra if m not in matches]
-       matches = matches[:5]
+       matches = self.engine.suggest(prefix, self.language.get())
 
        if not matches:
           self.hide_suggestions()
@@ -347,10 +2756,13 @@ class SyntaxFixer(tk.Tk):
         self.bind("<Control-o>", lambda e: self.open_file())
         self.bind("<Control-s>", lambda e: self.save_file())
         self.bind("<Control-Shift-S>", lambda e: self.save_file_as())
+        self.bind("<Control-Shift-F>", lambda e: self.show_find_in_files())
         self.bind("<Control-q>", lambda e: self.on_close())
         self.bind("<Control-Alt-c>", lambda e: self.toggle_auto_correct())
         self.bind("<Control-plus>", lambda e: self.change_font_size(1))
         self.bind("<Control-minus>", lambda e: self.change_font_size(-1))
+        self.bind("<Control-d>", lambda e: self.show_saved_diff())
+        self.bind("<Control-r>", lambda e: self.show_symbol_picker())
         self.bind("<Control-z>", lambda e: self.undo())
         self.bind("<Control-y>", lambda e: self.redo())
         self.bind("<Control-x>", lambda e: self.cut())
@@ -380,82 +2792,126 @@ class SyntaxFixer(tk.Tk):
       self.text.tag_configure("found", background="#515151")
 
     def highlight_syntax(self):
-       for tag in self.text.tag_names():
-         if tag not in ["current_line", "sel"]:
+       """Re-lex the lines touched since the last call and update only the tag ranges that changed"""
+       if self._highlight_reset:
+          self._highlight_reset = False
+          self._dirty_lines = None
+          for tag in TOKEN_TAGS:
             self.text.tag_remove(tag, "1.0", tk.END)
-       text = self.text.get("1.0", tk.END)
-       lines = text.split('\n')
+          line_runs, states = lex_lines(self.text.get("1.0", "end-1c").split('\n'), self.language.get())
+          self.apply_token_runs(line_runs)
+          self._applied_tags = [merge_runs(runs) for runs in line_runs]
+          self._line_states = list(states)
+          return
+       if self._dirty_lines is None:
+          return
+       first, last = self._dirty_lines
+       self._dirty_lines = None
+       line_count = len(self._applied_tags)
+       last = min(last, line_count)
        lang = self.language.get()
-       for i, line in enumerate(lines):
-         start_line = f"{i + 1}.0"
-         end_line = f"{i + 1}.end"
-         if lang == "Python":
-           
-            if '#' in line:
-                comment_start = line.find('#')
-                self.text.tag_add("comment", f"{i+1}.{comment_start}", end_line)
-           
-            for quote in ['"', "'"]:
-                start = 0
-                while True:
-                    start = line.find(quote, start)
-                    if start == -1:
-                        break
-                    end = line.find(quote, start + 1)
-                    if end == -1:
-                        end = len(line)
-                    self.text.tag_add("string", f"{i+1}.{start}", f"{i+1}.{end+1}")
-                    start = end + 1
-           
-            for match in re.finditer(r'\b\d+\.?\d*\b', line):
-                start, end = match.span()
-                self.text.tag_add("number", f"{i+1}.{start}", f"{i+1}.{end}")
-           
-            for word in re.finditer(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', line):
-                start, end = word.span()
-                word_text = word.group()
-                if word_text in PY_KEYWORDS:
-                    if word_text in ("def", "class", "import", "from"):
-                        self.text.tag_add(word_text, f"{i+1}.{start}", f"{i+1}.{end}")
-                    else:
-                        self.text.tag_add("keyword", f"{i+1}.{start}", f"{i+1}.{end}")
-                elif word_text in PY_BUILTINS:
-                    self.text.tag_add("builtin", f"{i+1}.{start}", f"{i+1}.{end}")
-                elif word_text in PY_LIBRARIES:
-                    self.text.tag_add("library", f"{i+1}.{start}", f"{i+1}.{end}")
-         elif lang == "Java":
-           
-            if '//' in line:
-                comment_start = line.find('//')
-                self.text.tag_add("java_comment", f"{i+1}.{comment_start}", end_line)
-           
-            for quote in ['"', "'"]:
-                start = 0
-                while True:
-                    start = line.find(quote, start)
-                    if start == -1:
-                        break
-                    end = line.find(quote, start + 1)
-                    if end == -1:
-                        end = len(line)
-                    self.text.tag_add("java_string", f"{i+1}.{start}", f"{i+1}.{end+1}")
-                    start = end + 1
-           
-            for match in re.finditer(r'\b\d+\.?\d*\b', line):
-                start, end = match.span()
-                self.text.tag_add("number", f"{i+1}.{start}", f"{i+1}.{end}")
-           
-            for word in re.finditer(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', line):
-                start, end = word.span()
-                word_text = word.group()
-                if word_text in JAVA_KEYWORDS:
-                    self.text.tag_add("java_keyword", f"{i+1}.{start}", f"{i+1}.{end}")
-                elif word_text in JAVA_BUILTINS:
-                    self.text.tag_add("java_builtin", f"{i+1}.{start}", f"{i+1}.{end}")
-                elif word_text[0].isupper():
-                    self.text.tag_add("java_type", f"{i+1}.{start}", f"{i+1}.{end}")
+       lines = self.text.get(f"{first}.0", f"{last}.end").split('\n')
+       state = (self._line_states[first - 2] or 0) if first > 1 else 0
+       removals = {}
+       additions = {}
+       line = first
+       while line <= line_count:
+         text = lines[line - first] if line <= last else self.text.get(f"{line}.0", f"{line}.end")
+         runs, end_state = tokenize_line(text, lang, state)
+         new = merge_runs(runs)
+         old = self._applied_tags[line - 1]
+         if old is None:
+            # Unknown tag state (multi-line edit); clear the whole line including its newline
+            for tag_id in range(len(TOKEN_TAGS)):
+               removals.setdefault(tag_id, []).extend((f"{line}.0", f"{line + 1}.0"))
+            for tag_id, spans in new.items():
+               for start, end in spans:
+                  additions.setdefault(tag_id, []).extend((f"{line}.{start}", f"{line}.{end}"))
+         elif old != new:
+            for tag_id in old.keys() | new.keys():
+               for start, end in interval_difference(old.get(tag_id, []), new.get(tag_id, [])):
+                  removals.setdefault(tag_id, []).extend((f"{line}.{start}", f"{line}.{end}"))
+               for start, end in interval_difference(new.get(tag_id, []), old.get(tag_id, [])):
+                  additions.setdefault(tag_id, []).extend((f"{line}.{start}", f"{line}.{end}"))
+         self._applied_tags[line - 1] = new
+         previous_state = self._line_states[line - 1]
+         self._line_states[line - 1] = end_state
+         if line >= last and end_state == previous_state:
+            break
+         state = end_state
+         line += 1
+       for tag_id, indices in removals.items():
+         self.tk.call(self.text._w, "tag", "remove", TOKEN_TAGS[tag_id], *indices)
+       for tag_id, indices in additions.items():
+         self.text.tag_add(TOKEN_TAGS[tag_id], *indices)
+
+    def mark_dirty_lines(self, first, last):
+       if self._dirty_lines is not None:
+          first = min(first, self._dirty_lines[0])
+          last = max(last, self._dirty_lines[1])
+       self._dirty_lines = (first, last)
+
+    def highlight_edit(self, op, start, end, text):
+       # Mirror the edit on the last applied tag spans so the next diff starts from what Tk holds
+       if op == "insert":
+          line = start[0]
+          added = end[0] - start[0]
+          if added == 0:
+             if self._applied_tags[line - 1] is not None:
+                self._applied_tags[line - 1] = shift_spans_insert(self._applied_tags[line - 1], start[1], len(text))
+          else:
+             self._applied_tags[line - 1:line] = [None] * (added + 1)
+             self._line_states[line - 1:line] = [None] * (added + 1)
+             if self._dirty_lines is not None and self._dirty_lines[1] > line:
+                self._dirty_lines = (self._dirty_lines[0] + added if self._dirty_lines[0] > line else self._dirty_lines[0],
+                                     self._dirty_lines[1] + added)
+          self.mark_dirty_lines(line, end[0])
+       elif op == "delete":
+          line = start[0]
+          removed = end[0] - start[0]
+          if removed == 0:
+             if self._applied_tags[line - 1] is not None:
+                self._applied_tags[line - 1] = shift_spans_delete(self._applied_tags[line - 1], start[1], end[1])
+          else:
+             self._applied_tags[line - 1:end[0]] = [None]
+             self._line_states[line - 1:end[0]] = [None]
+             if self._dirty_lines is not None:
+                first, last = self._dirty_lines
+                move = lambda n: n if n <= line else (line if n <= end[0] else n - removed)
+                self._dirty_lines = (move(first), move(last))
+          self.mark_dirty_lines(line, line)
+       else:
+          line_count = int(self.text.index("end-1c").split('.')[0])
+          self._applied_tags = [None] * line_count
+          self._line_states = [None] * line_count
+          self._highlight_reset = True
+
+    def highlight_document(self, content):
+       """Highlight freshly loaded content, reusing cached token runs when the file is unchanged"""
+       for tag in TOKEN_TAGS:
+         self.text.tag_remove(tag, "1.0", tk.END)
+       lang = self.language.get()
+       cached = self.token_cache.load(content, lang)
+       if cached is None:
+          line_runs, states = lex_lines(content.split('\n'), lang)
+          self.token_cache.store(content, lang, line_runs, states)
+       else:
+          line_runs, states = cached
+       self.apply_token_runs(line_runs)
+       self._applied_tags = [merge_runs(runs) for runs in line_runs]
+       self._line_states = list(states)
+       self._dirty_lines = None
+       self._highlight_reset = False
+
+    def apply_token_runs(self, line_runs, first_line=1):
+       # One tag_add call per tag keeps the Tcl round-trips independent of the token count
+       ranges = {}
+       for i, runs in enumerate(line_runs, first_line):
+         for k in range(0, len(runs), 3):
+            ranges.setdefault(runs[k], []).extend((f"{i}.{runs[k + 1]}", f"{i}.{runs[k + 2]}"))
+       for tag_id, indices in ranges.items():
+         self.text.tag_add(TOKEN_TAGS[tag_id], *indices)
 
-   
     def update_status_bar(self):
         cursor_pos = self.text.index(tk.INSERT)
         line, col = cursor_pos.split('.')
@@ -483,6 +2939,7 @@ class SyntaxFixer(tk.Tk):
        
         for i in range(1, line_count + 1):
             self.line_numbers.insert(tk.END, f"{i}\n")
+        self.apply_diff_markers()
        
         self.line_numbers.config(state=tk.DISABLED)
         self.highlight_current_line()
@@ -533,13 +2990,10 @@ class SyntaxFixer(tk.Tk):
 
       if lang == "Python":
        
-        block_starters = (
-            "def ", "class ", "if ", "elif ", "else", "for ", "while ", "try", "except", "finally", "with "
-        )
-        is_starter = any(prev_stripped.startswith(starter) for starter in block_starters)
-        needs_colon = is_starter and not prev_line.rstrip().endswith(":")
-        if needs_colon:
-            self.text.insert(line_end, ":")
+        is_starter = prev_stripped.startswith(PY_BLOCK_STARTERS)
+        suffix = self.engine.fix_line(prev_line, lang)
+        if suffix:
+            self.text.insert(line_end, suffix)
             prev_line = self.text.get(line_start, f"{line_end}+1c")
         self.text.mark_set(tk.INSERT, f"{line_num}.end")
         self.text.insert(tk.INSERT, "\n")
@@ -556,12 +3010,7 @@ class SyntaxFixer(tk.Tk):
 
       if lang == "Java":
        
-        block_pattern = (
-            r"(class\s+\w+)|(interface\s+\w+)|(^|\s)(public|private|protected)?\s*static\s*void\s+\w+\s*\([^\)]*\)$|"
-            r"^\s*(public|private|protected)?\s*\w+\s+\w+\s*\([^\)]*\)$"
-        )
-       
-        if re.match(block_pattern, prev_stripped):
+        if JAVA_BLOCK_PATTERN.match(prev_stripped):
             base_indent = len(prev_line) - len(prev_line.lstrip())
             indent = base_indent + 4
             self.text.mark_set(tk.INSERT, f"{line_num}.end")
@@ -595,19 +3044,9 @@ class SyntaxFixer(tk.Tk):
             self.highlight_syntax()
             return "break"
        
-        if prev_stripped.startswith(("case ", "default")) and not prev_stripped.endswith(":"):
-            self.text.insert(line_end, ":")
-       
-       
-        needs_semi = (
-            prev_stripped and
-            not prev_stripped.endswith((';', '{', '}', ':')) and
-            not prev_stripped.startswith(('public ', 'private ', 'protected ', 'class ', 'interface ', 'else', 'if(', 'for(', 'while(', 'switch(', '@')) and
-            not prev_stripped.startswith('//') and
-            not re.match(block_pattern, prev_stripped)
-        )
-        if needs_semi:
-            self.text.insert(line_end, ";")
+        suffix = self.engine.fix_line(prev_line, lang)
+        if suffix:
+            self.text.insert(line_end, suffix)
        
         prev_indent = len(prev_line) - len(prev_line.lstrip())
         self.text.mark_set(tk.INSERT, f"{line_num}.end")
@@ -723,24 +3162,7 @@ class SyntaxFixer(tk.Tk):
                 self.text.mark_set(tk.INSERT, f"{line_num}.{start + len(corrected_word)}")
    
     def autocorrect_word(self, word):
-        lang = self.language.get()
-        if lang == "Python":
-           lw = word.lower()
-           if lw in PY_ALIAS:
-              return PY_ALIAS[lw]
-           if word in ALL_WORDS or not word.isidentifier() or len(word) < 2:
-              return word
-           matches = difflib.get_close_matches(word, ALL_WORDS, n=1, cutoff=0.7)
-           return matches[0] if matches else word
-        elif lang == "Java":
-             lw = word.lower()
-             if lw in JAVA_ALIAS:
-                return JAVA_ALIAS[lw]
-             if word in ALL_WORDS_JAVA or not word.isidentifier() or len(word) < 2:
-                return word
-             matches = difflib.get_close_matches(word, ALL_WORDS_JAVA, n=1, cutoff=0.7)
-             return matches[0] if matches else word
-        return word
+        return self.engine.correct(word, self.language.get())
    
     def insert_pair(self, char):
         pair = PAIRS[char]
@@ -777,10 +3199,13 @@ class SyntaxFixer(tk.Tk):
         if self.unsaved_changes and not self.prompt_save():
             return
        
-        self.text.delete(1.0, tk.END)
+        self.set_buffer("")
         self.filename = None
         self.unsaved_changes = False
         self.last_save_time = None
+        self.reset_journal("", checkpoint=True)
+        self.set_diff_base("")
+        self.watch_file()
         self.title("SyntaxFixer - New File")
         self.update_status_bar()
         self.update_line_numbers()
@@ -791,28 +3216,46 @@ class SyntaxFixer(tk.Tk):
        
         filepath = filedialog.askopenfilename(filetypes=[("Python Files", "*.py"), ("All Files", "*.*")])
         if filepath:
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.text.delete(1.0, tk.END)
-                self.text.insert(tk.END, content)
-                self.filename = filepath
-                self.unsaved_changes = False
-                self.last_save_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.title(f"SyntaxFixer - {os.path.basename(filepath)}")
-                self.update_status_bar()
-                self.update_line_numbers()
-                self.highlight_syntax()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to open file:\n{str(e)}")
+            self.load_file(filepath)
+
+    def load_file(self, filepath):
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+            recovered = self.offer_recovery(filepath, content)
+            self.set_buffer(content if recovered is None else recovered)
+            self.text.edit_modified(False)
+            self.filename = filepath
+            self.unsaved_changes = recovered is not None
+            self.last_save_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if recovered is None:
+                self.reset_journal(content)
+            else:
+                self.reset_journal(recovered, checkpoint=True)
+            self.set_diff_base(content)
+            self.watch_file()
+            self.title(f"SyntaxFixer - {os.path.basename(filepath)}")
+            self.update_status_bar()
+            self.update_line_numbers()
+            self.highlight_document(content if recovered is None else recovered)
+            return True
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open file:\n{str(e)}")
+            return False
    
     def save_file(self, event=None):
         if not self.filename:
             return self.save_file_as()
+        if self.changed_on_disk() and not messagebox.askyesno(
+                "File Changed", f"{os.path.basename(self.filename)} was changed by another program.\n\nOverwrite it?"):
+            return False
         try:
             content = self.text.get(1.0, tk.END)
             with open(self.filename, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self.reset_journal(content[:-1])
+            self.set_diff_base(content[:-1])
+            self.watch_file()
             self.unsaved_changes = False
             self.last_save_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.update_status_bar()
@@ -882,43 +3325,228 @@ Ctrl+Y - Redo
 Ctrl+X - Cut
 Ctrl+C - Copy
 Ctrl+V - Paste
+Ctrl+Shift+F - Find in Files
 Ctrl+Alt+C - Toggle Auto-Correction
 
 View:
 Ctrl++ - Increase Font Size
 Ctrl+- - Decrease Font Size
+Ctrl+D - Compare with Saved
+Ctrl+R - Go to Symbol
 
 Auto-Correction:
-Space/Enter - Auto-correct words and function calls"""
+Space/Enter - Auto-correct words and function calls
+
+Help > Record Session saves a trace; replay it with
+python main.py --replay <trace>"""
         messagebox.showinfo("Keyboard Shortcuts", shortcuts)
    
     def on_close(self, event=None):
         if self.unsaved_changes and not self.prompt_save():
             return
+        self.discard_journal()
+        if self.recorder is not None:
+            self.recorder.close(self.text.get("1.0", "end-1c"))
+            self.recorder = None
+        if self.search_pool is not None:
+            self.search_pool.shutdown(wait=False, cancel_futures=True)
         self.destroy()
 
+TRACE_VERSION = 2
+CONTROL_MASK = 0x4
+ALT_MASK = 0x8
+
+
+def buffer_hash(text):
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class SessionRecorder:
+    """Opt-in trace of editor input: gzip'd JSON lines with a header, one [ms, kind, insert, sel, ...] list per event, and a footer"""
+
+    def __init__(self, path, header):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._file.write(json.dumps(dict(header, version=TRACE_VERSION)) + "\n")
+        self._started = time.perf_counter()
+
+    def record(self, kind, *data):
+        elapsed = round((time.perf_counter() - self._started) * 1000, 3)
+        self._file.write(json.dumps([elapsed, kind, *data]) + "\n")
+        # Sync-flush every event: the recorder runs before the handlers, so a trace from an
+        # editor that hangs or gets killed still ends with the event that caused it
+        self._file.flush()
+
+    def close(self, final_text):
+        self._file.write(json.dumps({"final_sha1": buffer_hash(final_text)}) + "\n")
+        self._file.close()
+
+
+def read_trace(path):
+    """(header, events, footer) of a recorded session; footer is None if recording never stopped"""
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+        except (EOFError, ValueError):
+            # The recorder was killed mid-session; keep everything before the truncated tail
+            pass
+    if not records or not isinstance(records[0], dict) or records[0].get("version") != TRACE_VERSION:
+        raise ValueError(f"{path} is not a SyntaxFixer trace")
+    footer = records[-1] if len(records) > 1 and isinstance(records[-1], dict) else None
+    return records[0], records[1:-1] if footer else records[1:], footer
+
+
+REPLAY_MOTIONS = {
+    "Left": "insert-1c", "Right": "insert+1c", "Up": "insert-1l", "Down": "insert+1l",
+    "Home": "insert linestart", "End": "insert lineend",
+}
+
+
+def replay_default_key(text, event):
+    """What the Tk Text class bindings would do for a key the editor's handlers let through"""
+    if event.state & (CONTROL_MASK | ALT_MASK):
+        # Clipboard and undo shortcuts are recorded as their own events
+        return
+    keysym = event.keysym
+    selection = text.tag_ranges("sel")
+    if keysym in ("BackSpace", "Delete"):
+        if selection:
+            text.delete(*selection[:2])
+        elif keysym == "BackSpace":
+            text.delete("insert-1c", tk.INSERT)
+        else:
+            text.delete(tk.INSERT)
+    elif keysym in REPLAY_MOTIONS:
+        text.mark_set(tk.INSERT, REPLAY_MOTIONS[keysym])
+    elif keysym == "Return":
+        text.insert(tk.INSERT, "\n")
+    elif len(event.char) == 1 and event.char >= " " and event.char != "\x7f":
+        if selection:
+            text.delete(*selection[:2])
+        text.insert(tk.INSERT, event.char)
+    text.see(tk.INSERT)
+
+
+def _timing_summary(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "total_ms": round(sum(samples), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def replay_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py --replay",
+                                     description="Replay a recorded session through the editor and time its handlers")
+    parser.add_argument("trace")
+    parser.add_argument("--slowest", type=int, default=10, help="number of slowest events to list")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    header, events, footer = read_trace(args.trace)
+
+    # Same vocabulary and in-process engine every run, so replays are deterministic
+    PY_PACKAGES.load()
+    app = SyntaxFixer()
+    app.withdraw()
+    app._journal_paused = True
+    app.engine = CorrectionEngine()
+    app.language.set(header["language"])
+    app.auto_correct_enabled.set(header["auto_correct"])
+    app.set_buffer(header["buffer"])
+    app._journal_paused = True
+    app.text.mark_set(tk.INSERT, header["cursor"])
+    app.highlight_document(header["buffer"])
+    app.update_line_numbers()
+    initial_matches = buffer_hash(app.text.get("1.0", "end-1c")) == header["buffer_sha1"]
+
+    timings = {}
+    slowest = []
+    for number, (stamp, kind, cursor, selection, *data) in enumerate(events):
+        app.text.mark_set(tk.INSERT, cursor)
+        app.text.tag_remove("sel", "1.0", tk.END)
+        if selection:
+            app.text.tag_add("sel", *selection)
+        if kind == "paste":
+            app.clipboard_clear()
+            app.clipboard_append(data[0])
+        started = time.perf_counter()
+        if kind in ("key", "release"):
+            keysym, char, state = data
+            event = types.SimpleNamespace(keysym=keysym, char=char, state=state, widget=app.text, x=0, y=0)
+            if kind == "release":
+                app.master_key_release_handler(event)
+            elif keysym == "Return":
+                if app.on_return_key(event) != "break":
+                    replay_default_key(app.text, event)
+            elif app.on_key_press(event) != "break":
+                replay_default_key(app.text, event)
+        elif kind in ("cut", "paste", "undo", "redo"):
+            # Run the Text class binding itself, exactly as the live virtual event did
+            app.text.event_generate(f"<<{kind.capitalize()}>>")
+        elif kind == "edit_undo":
+            app.undo()
+        elif kind == "edit_redo":
+            app.redo()
+        elif kind == "click":
+            app.text.mark_set(tk.INSERT, data[0])
+            app.text.tag_remove("sel", "1.0", tk.END)
+            app.update_line_numbers()
+        app.update_idletasks()
+        elapsed = (time.perf_counter() - started) * 1000
+        label = f"{kind}:{data[0]}" if kind in ("key", "release") else kind
+        timings.setdefault(kind, []).append(elapsed)
+        slowest.append((elapsed, number, stamp, label))
+
+    final_hash = buffer_hash(app.text.get("1.0", "end-1c"))
+    app.destroy()
+    slowest.sort(reverse=True)
+    report = {
+        "trace": args.trace,
+        "events": len(events),
+        "initial_buffer_matches": initial_matches,
+        "final_buffer_matches": final_hash == footer["final_sha1"] if footer else None,
+        "handlers": {kind: _timing_summary(samples) for kind, samples in timings.items()},
+        "slowest": [{"event": number, "recorded_at_ms": stamp, "what": label, "ms": round(elapsed, 3)}
+                    for elapsed, number, stamp, label in slowest[:args.slowest]],
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if report["final_buffer_matches"] is not False and initial_matches else 1
+
+
+COMMANDS = {
+    "--benchmark": benchmark_main,
+    "--daemon": daemon_main,
+    "--daemon-bench": daemon_bench_main,
+    "--replay": replay_main,
+}
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
     app = SyntaxFixer()
     # If user gave a file name, open it
     if len(sys.argv) > 1:
         filepath = sys.argv[1]
         if os.path.exists(filepath):
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-                app.text.delete(1.0, tk.END)
-                app.text.insert(tk.END, content)
-                app.filename = filepath
-                app.unsaved_changes = False
-                app.title(f"SyntaxFixer - {os.path.basename(filepath)}")
-                app.update_status_bar()
-                app.update_line_numbers()
-                app.highlight_syntax()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to open {filepath}:\n{e}")
+            app.load_file(filepath)
         else:
             # If file doesn’t exist, set name so saving will create it
             app.filename = filepath
             app.title(f"SyntaxFixer - {os.path.basename(filepath)}")
+    else:
+        app.recover_untitled()
 
     app.mainloop()